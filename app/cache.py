@@ -0,0 +1,85 @@
+# Imports from app modules
+from app.config import settings
+
+# Imports from standard library
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, TypeVar
+import time
+
+ValueT = TypeVar("ValueT")
+
+
+class TTLCache(Generic[ValueT]):
+    """
+    Bounded in-process cache with per-entry time to live.
+    When the cache is full the least recently used entry is evicted.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[float, ValueT]] = OrderedDict()
+
+    def get(self, key: Hashable) -> ValueT | None:
+        """
+        Returns the cached value for the key, or None if it is missing or expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: ValueT) -> None:
+        """
+        Stores the value under the key, evicting the least recently used entries if needed.
+        """
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Removes the entry for the key, if there is one.
+        """
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Removes all entries and resets the counters.
+        """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns the size and hit/miss counters of the cache.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
+
+
+# Verified principals ((user id, shared user version) -> username) of authenticated requests.
+# The cache is per process; with the response cache in Redis the entries are keyed by the user's shared version,
+# which every worker bumps on an update or deletion. Otherwise the other workers only see it once their entry expires.
+principal_cache: TTLCache[str] = TTLCache(settings.AUTH_CACHE_MAX_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
@@ -10,5 +10,44 @@ class Settings(BaseSettings):
     JWT_EXPIRATION_MINUTES: int
     REFRESH_TOKEN_EXPIRATION_DAYS: int
     REFRESH_TOKEN_SECRET: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    AUTH_CACHE_TTL_SECONDS: float = 15
+    AUTH_CACHE_MAX_SIZE: int = 10000
+    ADMIN_API_KEY: str | None = None
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    LIST_ITEMS_INSERT_BATCH_SIZE: int = 500
+    EXPORT_BATCH_SIZE: int = 1000
+    IMPORT_CHUNK_SIZE: int = 500
+    IMPORT_CHUNK_MAX_ITEMS: int = 10000
+    LIST_ITEMS_BATCH_MAX_IDS: int = 1000
+    BATCH_MAX_OPERATIONS: int = 50
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+    SLOW_QUERY_MAX_PARAMETERS_LENGTH: int = 1000
+    SERVER_TIMING_ENABLED: bool = True
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_REDIS_URL: str | None = None
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+    RESPONSE_CACHE_MAX_SIZE: int = 10000
+    RESPONSE_CACHE_MAX_ENTRY_BYTES: int = 262144
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_USER_PER_SECOND: float = 20
+    RATE_LIMIT_USER_BURST: float = 40
+    RATE_LIMIT_IP_PER_SECOND: float = 50
+    RATE_LIMIT_IP_BURST: float = 100
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    EXPENSIVE_ROUTES: list[str] = ["/export", "/import", "/batch", "/search"]
+    EXPENSIVE_ROUTES_MAX_CONCURRENCY: int = 8
+    EVENTS_HEARTBEAT_SECONDS: float = 15
+    EVENTS_QUEUE_SIZE: int = 100
+    EVENTS_MAX_STREAMS_PER_USER: int = 5
+    EVENTS_MAX_IDS: int = 100
+    SYNC_TOMBSTONE_RETENTION_DAYS: float = 30
+    SYNC_SETTLE_SECONDS: float = 2
 
 settings = Settings() # type: ignore
\ No newline at end of file
@@ -1,26 +1,90 @@
 # Imports from external libraries
 from sqlmodel import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import asc, desc
+from sqlalchemy import asc, desc, insert, Row
 
 # Imports from app modules
 from app.models.list import List
+from app.models.list_item import ListItem
+from app.models.tombstone import TombstoneEntity
 from app.schemas.list import ListCreate, ListUpdate
+from app.pagination import keyset_condition, fetch_page
+from app.search import contains_condition, ranked_search
+from app.db import track_write
+import app.crud.list_item_crud as list_item_crud
+import app.crud.sync_crud as sync_crud
+import app.response_cache as response_cache
+import app.events as events
 
 # Imports from standard library
 from datetime import datetime
+from typing import Any, AsyncIterator, Sequence
 
 async def create_list(session: AsyncSession, list: ListCreate, user_id: int) -> List:
-    """Create a new list."""
-    list_dict = list.model_dump()
+    """
+    Create a new list together with its initial items in one transaction, 
+    so a failure doesn't leave an empty list behind.
+    """
+    list_dict = list.model_dump(exclude={"list_items"})
     list_dict["user_id"] = user_id
     db_list = List.model_validate(list_dict)
     db_list.last_modified_at = db_list.created_at
+    db_list.item_count = len(list.list_items or [])
     session.add(db_list)
+    # Assigns the list's id for its items
+    await session.flush()
+    track_write(session, db_list.created_at, [db_list.id]) #type: ignore
+    if list.list_items:
+        rows = list_item_crud.build_list_item_rows(list.list_items, db_list.id, db_list.created_at) #type: ignore
+        await list_item_crud.insert_list_items(session, rows)
+    events.publish(session, user_id, "list.created", db_list.id)
     await session.commit()
-    await session.refresh(db_list)
+    await response_cache.bump_user_version(user_id)
     return db_list
 
+def user_lists_conditions(user_id: int, name: str | None = None) -> list[Any]:
+    """Builds the filter conditions selecting a user's lists."""
+    conditions = [List.user_id == user_id]
+    if name:
+        conditions.append(contains_condition(List.id, List.name, name, user_id))
+    return conditions
+
+async def import_lists(session: AsyncSession, lists: list[ListCreate], user_id: int) -> tuple[int, int]:
+    """
+    Creates many lists with their items in one transaction using bulk inserts.
+    Returns the number of created lists and items.
+    """
+    now = datetime.now()
+    list_rows = [{
+        "name": lst.name,
+        "user_id": user_id,
+        "created_at": now,
+        "last_modified_at": now,
+        "item_count": len(lst.list_items or [])
+    } for lst in lists]
+    # RETURNING itself doesn't guarantee the order of the rows, so they are matched back to the parameters
+    list_ids = list((await session.scalars(insert(List).returning(List.id, sort_by_parameter_order=True), list_rows)).all()) #type: ignore
+    track_write(session, now, list_ids)
+    item_rows = []
+    for lst, list_id in zip(lists, list_ids):
+        if lst.list_items:
+            item_rows.extend(list_item_crud.build_list_item_rows(lst.list_items, list_id, now))
+    if item_rows:
+        await session.execute(insert(ListItem), item_rows)
+    events.publish(session, user_id, "lists.imported", None, ids=list_ids)
+    await session.commit()
+    await response_cache.bump_user_version(user_id)
+    return len(list_ids), len(item_rows)
+
+async def get_user_lists_version(session: AsyncSession, user_id: int, name: str | None = None) -> tuple[datetime | None, int]:
+    """
+    Returns the latest modification time and the number of a user's lists, which together change whenever 
+    a list is created, updated or deleted, without loading any list.
+    """
+    query = select(func.max(List.last_modified_at), func.count(List.id)).where(*user_lists_conditions(user_id, name)) #type: ignore
+    last_modified_at, count = (await session.execute(query)).one()
+    return last_modified_at, count
+
 async def get_user_lists(
         session: AsyncSession, 
         user_id: int, 
@@ -28,34 +92,50 @@ async def get_user_lists(
         sort_by: str | None = None, 
         sort_order: str | None = None,
         page: int = 1,
-        page_size: int = 10
-) -> tuple[list[List], int]:
-    """Get lists of a user."""
-    conditions = [List.user_id == user_id]
-    if name:
-        conditions.append(List.name.ilike(f'%{name}%')) #type: ignore
-
-    query = select(List).where(*conditions)
-
+        page_size: int = 10,
+        after: tuple[Any, int] | None = None,
+        include_total: bool = True
+) -> tuple[list[List], int | None, tuple[Any, int] | None]:
+    """
+    Get lists of a user, together with the total number of matching lists (None unless "include_total").
+    Pages are selected by offset, or by seeking past the "after" (sort value, id) position when given.
+    Also returns the (sort value, id) position of the last list if there are more lists.
+    """
+    conditions = user_lists_conditions(user_id, name)
     count_query = select(func.count(List.id)).where(*conditions) #type: ignore
-    total_items_result = await session.execute(count_query)
-    total_items = total_items_result.scalar_one()
 
+    # The id breaks ties, so that the order (and therefore every page) is deterministic
+    sort_col = getattr(List, sort_by, None) if sort_by else None
+    sort_col = sort_col if sort_col is not None else List.id
+    descending = sort_order == "desc"
+    order = desc if descending else asc
+    order_by = [order(sort_col)] if sort_col is List.id else [order(sort_col), order(List.id)]
 
-    if sort_by:
-        col = getattr(List, sort_by, None)
-        if col:
-            if sort_order and sort_order == "desc":
-                query = query.order_by(desc(col))
-            else:
-                query = query.order_by(asc(col))
+    if after:
+        conditions.append(keyset_condition(sort_col, List.id, after, descending))
+    query = select(List).where(*conditions).order_by(*order_by)
 
-    offset = (page - 1) * page_size
-    query = query.offset(offset).limit(page_size)
-
-    lists = await session.execute(query)
-    return list(lists.scalars().all()), total_items
+    lists, total_items, has_more = await fetch_page(session, query, count_query, page, page_size, after, include_total)
+    next_key = (getattr(lists[-1], sort_col.key), lists[-1].id) if has_more else None
+    return lists, total_items, next_key
     
+async def search_user_lists(
+        session: AsyncSession,
+        user_id: int,
+        term: str,
+        page: int = 1,
+        page_size: int = 10,
+        include_total: bool = True
+) -> tuple[list[List], int | None]:
+    """
+    Searches the user's lists whose name contains the term, most relevant first, 
+    together with the total number of matching lists (None unless "include_total").
+    """
+    count_query = select(func.count(List.id)).where(*user_lists_conditions(user_id, term)) #type: ignore
+    query = ranked_search(select(List).where(List.user_id == user_id), session.bind.dialect.name, List.id, List.name, term, user_id) #type: ignore
+    lists, total_items, _ = await fetch_page(session, query, count_query, page, page_size, None, include_total)
+    return lists, total_items
+
 async def get_user_list_by_id(session: AsyncSession, user_id: int, list_id: int) -> List | None:
     """Searches for a list by its id and user's id."""
     found_list = await session.execute(select(List).where(List.id == list_id, List.user_id == user_id))
@@ -66,12 +146,39 @@ async def update_list(session: AsyncSession, list: List, list_updates: ListUpdat
     new_list_data = list_updates.model_dump(exclude_unset=True)
     list.sqlmodel_update(new_list_data)
     list.last_modified_at = datetime.now()
+    track_write(session, list.last_modified_at, [list.id]) #type: ignore
     session.add(list)
+    events.publish(session, list.user_id, "list.updated", list.id)
     await session.commit()
+    await response_cache.bump_user_version(list.user_id)
     await session.refresh(list)
     return list
 
 async def delete_list(session: AsyncSession, list: List) -> None:
-    """Delete a list."""
+    """Delete a list, recording its deletion for delta sync (its items go with it)."""
     await session.delete(list)
-    await session.commit()
\ No newline at end of file
+    await sync_crud.record_tombstones(session, list.user_id, TombstoneEntity.list, [list.id], list.id, datetime.now()) #type: ignore
+    events.publish(session, list.user_id, "list.deleted", list.id)
+    await session.commit()
+    await response_cache.bump_user_version(list.user_id)
+
+async def stream_user_lists_with_items(session: AsyncSession, user_id: int, batch_size: int = 1000) -> AsyncIterator[Sequence[Row[Any]]]:
+    """
+    Streams all lists of a user joined with their items, ordered by list and then by item, in batches of rows.
+    Lists without items come as a single row with empty item columns.
+    Rows are read through a server-side cursor, so memory doesn't grow with the number of rows.
+    """
+    query = (
+        select(
+            List.id, List.name, List.created_at, List.last_modified_at,
+            ListItem.id.label("item_id"), ListItem.content, ListItem.is_completed, #type: ignore
+            ListItem.created_at.label("item_created_at"), ListItem.last_modified_at.label("item_last_modified_at") #type: ignore
+        )
+        .outerjoin(ListItem, ListItem.list_id == List.id) #type: ignore
+        .where(List.user_id == user_id)
+        .order_by(asc(List.id), asc(ListItem.created_at), asc(ListItem.id))
+        .execution_options(yield_per=batch_size)
+    )
+    result = await session.stream(query)
+    async for rows in result.partitions(batch_size):
+        yield rows
\ No newline at end of file
@@ -1,37 +1,129 @@
 # Imports from external libraries
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select, func, asc
+from sqlalchemy.orm import contains_eager, aliased
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import insert, update, delete
 
 # Imports from app modules
 from app.models.list_item import ListItem
-from app.schemas.list_item import ListItemUpdate
+from app.schemas.list_item import ListItemUpdate, ListItemsBatch
 from app.models.list import List
+from app.models.tombstone import TombstoneEntity
+from app.pagination import keyset_condition, fetch_page
+from app.search import contains_condition, ranked_search
+from app.db import track_write
+from app.config import settings
+import app.crud.sync_crud as sync_crud
+import app.response_cache as response_cache
+import app.events as events
 
 # Imports from standard library
 from datetime import datetime
+from typing import Any
 
 
-async def create_list_items(session: AsyncSession, list_items: list[str], to_do_list: List) -> list[ListItem]:
+def build_list_item_rows(list_items: list[str], list_id: int, now: datetime) -> list[dict[str, Any]]:
     """
-    Creates list items in the list and stores them in the db
+    Builds the rows to insert for new list items with the given contents.
     """
-    items : list['ListItem'] = []
+    return [{
+        "content": content,
+        "list_id": list_id,
+        "created_at": now,
+        "last_modified_at": now,
+        "is_completed": False
+    } for content in list_items]
+
+
+async def insert_list_items(session: AsyncSession, rows: list[dict[str, Any]]) -> list[ListItem]:
+    """
+    Inserts list item rows in batches of LIST_ITEMS_INSERT_BATCH_SIZE, using multi-row INSERT ... RETURNING,
+    and returns them in the given order. Doesn't commit.
+    Falls back to an executemany flush when the database can't return rows from a batch insert.
+    """
+    items: list[ListItem] = []
+    batch_size = settings.LIST_ITEMS_INSERT_BATCH_SIZE
+    returning_supported = session.bind.dialect.insert_executemany_returning #type: ignore
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        if returning_supported:
+            # RETURNING itself doesn't guarantee the order of the rows, so they are matched back to the parameters
+            inserted = await session.scalars(insert(ListItem).returning(ListItem, sort_by_parameter_order=True), batch)
+            items.extend(inserted.all())
+        else:
+            batch_items = [ListItem(**row) for row in batch]
+            session.add_all(batch_items)
+            await session.flush()
+            items.extend(batch_items)
+    return items
+
+
+async def _update_list_counters(session: AsyncSession, to_do_list: List, values: dict[str, Any]) -> None:
+    """
+    Updates the list's item counters and last_modified_at with the given values in one statement
+    and copies the stored values to the loaded list. Doesn't commit.
+    """
+    track_write(session, values["last_modified_at"], [to_do_list.id]) #type: ignore
+    stored = (await session.execute(
+        update(List)
+        .where(List.id == to_do_list.id)
+        .values(**values)
+        .returning(List.item_count, List.completed_count, List.last_modified_at)
+        .execution_options(synchronize_session=False)
+    )).one()
+    for key, value in stored._mapping.items():
+        set_committed_value(to_do_list, key, value)
+
+
+async def adjust_item_counters(session: AsyncSession, to_do_list: List, now: datetime, items_delta: int = 0, completed_delta: int = 0) -> None:
+    """
+    Adds the deltas to the list's item counters and bumps its last_modified_at.
+    The counters are incremented in the database, so concurrent changes to the same list don't overwrite each other.
+    """
+    await _update_list_counters(session, to_do_list, {
+        "item_count": List.item_count + items_delta,
+        "completed_count": List.completed_count + completed_delta,
+        "last_modified_at": now
+    })
+
+
+async def recount_item_counters(session: AsyncSession, to_do_list: List, now: datetime) -> None:
+    """
+    Recomputes the list's item counters from its items and bumps its last_modified_at,
+    for changes to many items at once where the deltas aren't known.
+    """
+    items_of_list = ListItem.list_id == to_do_list.id
+    await _update_list_counters(session, to_do_list, {
+        "item_count": select(func.count(ListItem.id)).where(items_of_list).scalar_subquery(), #type: ignore
+        "completed_count": select(func.count(ListItem.id)).where(items_of_list, ListItem.is_completed).scalar_subquery(), #type: ignore
+        "last_modified_at": now
+    })
+
+
+async def create_list_items(session: AsyncSession, list_items: list[str], list_id: int, user_id: int) -> list[ListItem] | None:
+    """
+    Creates list items in the user's list and stores them in the db.
+    The list's counters are updated first, by a statement that only matches the list if it belongs to the user,
+    so the ownership check doesn't need a query of its own. Returns None if the user has no such list.
+    """
+    now = datetime.now()
+    to_do_list = await session.scalar(
+        update(List)
+        .where(List.id == list_id, List.user_id == user_id)
+        .values(item_count=List.item_count + len(list_items), last_modified_at=now)
+        .returning(List)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    if to_do_list is None:
+        return None
+    track_write(session, now, [list_id])
+    rows = build_list_item_rows(list_items, list_id, now)
+    items = await insert_list_items(session, rows) if rows else []
+    events.publish(session, to_do_list.user_id, "list_item.created", to_do_list.id, ids=[item.id for item in items]) #type: ignore
 
-    for item in list_items:
-        list_item_dict = {}
-        list_item_dict["content"] = item
-        list_item_dict["list_id"] = to_do_list.id
-        db_list_item = ListItem.model_validate(list_item_dict)
-        session.add(db_list_item)
-        items.append(db_list_item)
-    
-    to_do_list.last_modified_at = datetime.now()
-    session.add(to_do_list)
     await session.commit()
-    for item in items:
-        await session.refresh(item)
-    await session.refresh(to_do_list)
-    
+    await response_cache.bump_user_version(to_do_list.user_id)
     return items
 
 
@@ -40,30 +132,80 @@ async def get_list_items(
         list_id: int, 
         user_id: int, 
         page: int = 1, 
-        page_size: int = 10
-) -> tuple[list['ListItem'], int]:
+        page_size: int = 10,
+        after: tuple[Any, int] | None = None,
+        include_total: bool = True
+) -> tuple[List | None, list['ListItem'], int | None, tuple[Any, int] | None]:
     """
-    Retrieve and return all list items within the user's list.
+    Retrieve the user's list together with one page of its items, oldest first, in a single query:
+    the page is outer joined to the list, so no row means the user has no such list
+    and a row without an item means the page is empty.
+    The total number of items (None unless "include_total") comes from the list's item counter.
+    Pages are selected by offset, or by seeking past the "after" (created_at, id) position when given.
+    Also returns the (created_at, id) position of the last item if there are more items.
     """
-    conditions = [ListItem.list_id == list_id, List.user_id == user_id]
-    count_query = select(func.count(ListItem.id)).join(List).where(*conditions) #type: ignore
-    total_items_result = await session.execute(count_query)
-    total_items = total_items_result.scalar_one()
-    if total_items == 0:
-        return [], 0
+    page_query = select(ListItem).where(ListItem.list_id == list_id)
+    if after:
+        page_query = page_query.where(keyset_condition(ListItem.created_at, ListItem.id, after, descending=False))
+    else:
+        page_query = page_query.offset((page - 1) * page_size)
+    page_query = page_query.order_by(asc(ListItem.created_at), asc(ListItem.id)).limit(page_size + 1)
+    page_item = aliased(ListItem, page_query.subquery())
 
-    offset = (page - 1) * page_size
-    list_items = await session.execute(select(ListItem).join(List).where(*conditions).order_by(asc(ListItem.created_at)).offset(offset).limit(page_size))
-    return list(list_items.scalars().all()), total_items
+    # The page is read in order from the index by the subquery; ordering the joined rows again in SQL
+    # would sort them in a temporary table, so the few rows of the page are put back in order here instead
+    query = (
+        select(List, page_item)
+        .outerjoin(page_item, page_item.list_id == List.id)
+        .where(List.id == list_id, List.user_id == user_id)
+    )
+    rows = (await session.execute(query)).all()
+    if not rows:
+        return None, [], None, None
+
+    found_list = rows[0][0]
+    list_items = sorted((row[1] for row in rows if row[1] is not None), key=lambda item: (item.created_at, item.id))
+    has_more = len(list_items) > page_size
+    list_items = list_items[:page_size]
+    total_items = found_list.item_count if include_total else None
+    next_key = (list_items[-1].created_at, list_items[-1].id) if has_more else None
+    return found_list, list_items, total_items, next_key
+
+
+async def search_user_list_items(
+        session: AsyncSession,
+        user_id: int,
+        term: str,
+        page: int = 1,
+        page_size: int = 10,
+        include_total: bool = True
+) -> tuple[list[ListItem], int | None]:
+    """
+    Searches the items of all the user's lists whose content contains the term, most relevant first,
+    together with the total number of matching items (None unless "include_total").
+    """
+    count_query = select(func.count(ListItem.id)).join(List).where( #type: ignore
+        List.user_id == user_id, contains_condition(ListItem.id, ListItem.content, term, user_id)
+    )
+    query = ranked_search(
+        select(ListItem).join(List).where(List.user_id == user_id), 
+        session.bind.dialect.name, ListItem.id, ListItem.content, term, user_id #type: ignore
+    )
+    list_items, total_items, _ = await fetch_page(session, query, count_query, page, page_size, None, include_total)
+    return list_items, total_items
 
 
-async def get_list_item_by_id(session: AsyncSession, list_item_id: int, list_id: int, user_id: int) -> ListItem | None:
+async def get_list_item_by_id(session: AsyncSession, list_item_id: int, list_id: int, user_id: int, with_list: bool = False) -> ListItem | None:
     """
     Search for a list item by its ID within the list and return it if found; otherwise, return None.
+    The parent list is populated from the same join only when requested with "with_list".
     """
-    list_item = await session.execute(select(ListItem).join(List).where(ListItem.id == list_item_id,
-                                                                         ListItem.list_id == list_id,
-                                                                         List.user_id == user_id))
+    query = select(ListItem).join(List).where(ListItem.id == list_item_id,
+                                              ListItem.list_id == list_id,
+                                              List.user_id == user_id)
+    if with_list:
+        query = query.options(contains_eager(ListItem.list)) #type: ignore
+    list_item = await session.execute(query)
     return list_item.scalars().first()
 
 
@@ -74,17 +216,39 @@ async def update_list_item(
         updated_list_item: ListItemUpdate
 ) -> ListItem:
     """
-    Updates the list item by its id within the list and save it in the database.
+    Updates the list item by its id within the list and save it in the database, with a single UPDATE of the item
+    unless it was completed or uncompleted concurrently since it was read.
+    The stored values are copied to the loaded item and list, so they aren't read again.
     """
-    new_data = updated_list_item.model_dump(exclude_unset=True)
-    list_item.sqlmodel_update(new_data)
-    list_item.last_modified_at = datetime.now()
-    list.last_modified_at = datetime.now()
-    session.add(list_item)
-    session.add(list)
+    now = datetime.now()
+    values = {**updated_list_item.model_dump(exclude_unset=True, exclude_none=True), "last_modified_at": now}
+    statement = (
+        update(ListItem)
+        .where(ListItem.id == list_item.id)
+        .returning(ListItem)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    completed_delta = 0
+    is_completed = values.get("is_completed")
+    if is_completed is None:
+        await session.scalar(statement.values(**values))
+    else:
+        # The statement only matches while the item is in the state it was read in, so it tells whether it flips
+        read_completed = list_item.is_completed
+        if await session.scalar(statement.where(ListItem.is_completed == read_completed).values(**values)) is not None:
+            flipped = is_completed != read_completed
+        else:
+            # Changed concurrently: only an actual flip is counted, so concurrent identical updates are counted once
+            flipped = await session.scalar(statement.where(ListItem.is_completed != is_completed).values(**values)) is not None
+            if not flipped:
+                del values["is_completed"]
+                await session.scalar(statement.values(**values))
+        if flipped:
+            completed_delta = 1 if is_completed else -1
+    await adjust_item_counters(session, list, now, completed_delta=completed_delta)
+    events.publish(session, list.user_id, "list_item.updated", list.id, ids=[list_item.id]) #type: ignore
     await session.commit()
-    await session.refresh(list_item)
-    await session.refresh(list)
+    await response_cache.bump_user_version(list.user_id)
     return list_item
 
 
@@ -92,6 +256,60 @@ async def delete_list_item(session: AsyncSession, list_item: ListItem) -> None:
     """
     Deletes the list item by its id within the list.
     """
-    await session.delete(list_item)
-    list_item.list.last_modified_at = datetime.now()
-    await session.commit()
\ No newline at end of file
+    was_completed = await session.scalar(
+        delete(ListItem)
+        .where(ListItem.id == list_item.id)
+        .returning(ListItem.is_completed)
+        .execution_options(synchronize_session=False)
+    )
+    session.expunge(list_item)
+    # A concurrent request may have deleted the item already and updated the counters for it
+    if was_completed is not None:
+        now = datetime.now()
+        await adjust_item_counters(session, list_item.list, now, items_delta=-1, completed_delta=-1 if was_completed else 0)
+        await sync_crud.record_tombstones(session, list_item.list.user_id, TombstoneEntity.list_item, [list_item.id], list_item.list_id, now) #type: ignore
+        events.publish(session, list_item.list.user_id, "list_item.deleted", list_item.list_id, ids=[list_item.id]) #type: ignore
+    await session.commit()
+    await response_cache.bump_user_version(list_item.list.user_id)
+
+
+async def apply_list_items_batch(session: AsyncSession, to_do_list: List, batch: ListItemsBatch) -> tuple[list[ListItem], list[int]]:
+    """
+    Applies the same changes to many items of the list and deletes many items of the list,
+    with one UPDATE and one DELETE statement, and recounts the list's items and bumps its last_modified_at once.
+    Ids that aren't items of the list are ignored; an id both updated and deleted ends up deleted.
+    Returns the updated items and the ids of the deleted items.
+    """
+    now = datetime.now()
+    updated_items: list[ListItem] = []
+    deleted_ids: list[int] = []
+    changes = batch.update.changes.model_dump(exclude_unset=True) if batch.update else {}
+    if batch.update and batch.update.ids and changes:
+        result = await session.scalars(
+            update(ListItem)
+            .where(ListItem.list_id == to_do_list.id, ListItem.id.in_(batch.update.ids)) #type: ignore
+            .values(**changes, last_modified_at=now)
+            .returning(ListItem)
+            .execution_options(synchronize_session=False)
+        )
+        updated_items = list(result.all())
+    if batch.delete:
+        result = await session.scalars(
+            delete(ListItem)
+            .where(ListItem.list_id == to_do_list.id, ListItem.id.in_(batch.delete)) #type: ignore
+            .returning(ListItem.id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted_ids = sorted(result.all())
+        await sync_crud.record_tombstones(session, to_do_list.user_id, TombstoneEntity.list_item, deleted_ids, to_do_list.id, now) #type: ignore
+    if updated_items or deleted_ids:
+        await recount_item_counters(session, to_do_list, now)
+    deleted = set(deleted_ids)
+    updated_items = sorted((item for item in updated_items if item.id not in deleted), key=lambda item: item.id) #type: ignore
+    if updated_items:
+        events.publish(session, to_do_list.user_id, "list_item.updated", to_do_list.id, ids=[item.id for item in updated_items]) #type: ignore
+    if deleted_ids:
+        events.publish(session, to_do_list.user_id, "list_item.deleted", to_do_list.id, ids=deleted_ids) #type: ignore
+    await session.commit()
+    await response_cache.bump_user_version(to_do_list.user_id)
+    return updated_items, deleted_ids
\ No newline at end of file
@@ -0,0 +1,126 @@
+# Imports from external libraries
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select, asc
+from sqlalchemy import insert, delete
+
+# Imports from app modules
+from app.models.list import List
+from app.models.list_item import ListItem
+from app.models.tombstone import Tombstone, TombstoneEntity
+from app.pagination import keyset_condition
+from app.exceptions import SyncTokenExpiredException
+from app.db import track_write
+from app.config import settings
+
+# Imports from standard library
+from datetime import datetime, timedelta
+from typing import Any
+import heapq
+
+# The change streams merged by a sync, in the order their changes are taken when modified at the same time
+SYNC_STREAMS = ("tombstones", "lists", "list_items")
+
+
+async def record_tombstones(session: AsyncSession, user_id: int, entity: TombstoneEntity, ids: list[int], list_id: int, now: datetime) -> None:
+    """
+    Records the deletion of the user's lists or list items in the current transaction, for delta sync,
+    and drops the user's tombstones older than the retention period.
+    """
+    if not ids:
+        return
+    track_write(session, now, [list_id])
+    await session.execute(insert(Tombstone), [
+        {"user_id": user_id, "entity": entity, "entity_id": entity_id, "list_id": list_id, "deleted_at": now}
+        for entity_id in ids
+    ])
+    await session.execute(
+        delete(Tombstone)
+        .where(
+            Tombstone.user_id == user_id,
+            Tombstone.deleted_at < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS) #type: ignore
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def initial_positions(now: datetime) -> dict[str, tuple[datetime, int]]:
+    """
+    The positions of a first sync: all existing lists and items, but none of the deletions that happened before it.
+    """
+    return {"tombstones": (now, 0), "lists": (datetime.min, 0), "list_items": (datetime.min, 0)}
+
+
+async def get_changes(
+        session: AsyncSession,
+        user_id: int,
+        positions: dict[str, tuple[datetime, int]] | None,
+        page_size: int
+) -> tuple[list[List], list[ListItem], list[Tombstone], dict[str, tuple[datetime, int]], bool]:
+    """
+    Gets the user's lists, list items and tombstones changed after the given positions, oldest change first,
+    with at most "page_size" changes in total.
+    Each kind of change is read from an index in (modification time, id) order and the three are merged,
+    so a sync costs as much as the changes since the positions rather than all of the user's data.
+    Changes of the last SYNC_SETTLE_SECONDS are left for the next sync, so a transaction that commits
+    shortly after another with a later timestamp isn't skipped (see restamp_late_writes for longer ones).
+    Returns the changes, the positions after them and whether there are more changes.
+    Raises SyncTokenExpiredException if tombstones newer than the positions may have been dropped already.
+    """
+    now = datetime.now()
+    cutoff = now - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    if positions is None:
+        positions = initial_positions(cutoff)
+    elif positions["tombstones"][0] < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+        raise SyncTokenExpiredException("The sync token has expired, a full sync is required.")
+
+    queries = {
+        "tombstones": select(Tombstone).where(Tombstone.user_id == user_id),
+        "lists": select(List).where(List.user_id == user_id),
+        # Every change to an item also bumps its list's last_modified_at to at least the item's,
+        # so only the lists changed since the position are looked into for changed items,
+        # instead of probing the items of every list of the user
+        "list_items": (
+            select(ListItem)
+            .join(List, ListItem.list_id == List.id) #type: ignore
+            .where(List.user_id == user_id, List.last_modified_at >= positions["list_items"][0])
+        )
+    }
+    columns: dict[str, tuple[Any, Any]] = {
+        "tombstones": (Tombstone.deleted_at, Tombstone.id),
+        "lists": (List.last_modified_at, List.id),
+        "list_items": (ListItem.last_modified_at, ListItem.id)
+    }
+    fetched: dict[str, list[Any]] = {}
+    for stream in SYNC_STREAMS:
+        sort_column, id_column = columns[stream]
+        query = (
+            queries[stream]
+            .where(keyset_condition(sort_column, id_column, positions[stream], descending=False), sort_column <= cutoff)
+            .order_by(asc(sort_column), asc(id_column))
+            .limit(page_size + 1)
+        )
+        fetched[stream] = list((await session.scalars(query)).all())
+
+    def changes(stream: str):
+        sort_column, id_column = columns[stream]
+        for row in fetched[stream]:
+            yield (getattr(row, sort_column.key), SYNC_STREAMS.index(stream), getattr(row, id_column.key)), stream, row
+
+    taken: dict[str, list[Any]] = {stream: [] for stream in SYNC_STREAMS}
+    merged = heapq.merge(*(changes(stream) for stream in SYNC_STREAMS), key=lambda change: change[0])
+    for _, stream, row in merged:
+        if sum(len(rows) for rows in taken.values()) == page_size:
+            break
+        taken[stream].append(row)
+    has_more = sum(len(rows) for rows in fetched.values()) > page_size
+
+    next_positions = dict(positions)
+    for stream in SYNC_STREAMS:
+        sort_column, id_column = columns[stream]
+        if taken[stream]:
+            last = taken[stream][-1]
+            next_positions[stream] = (getattr(last, sort_column.key), getattr(last, id_column.key))
+        if len(taken[stream]) == len(fetched[stream]):
+            # Nothing is left in this stream up to the cutoff, so the next sync can start from there
+            next_positions[stream] = max(next_positions[stream], (cutoff, 0))
+    return taken["lists"], taken["list_items"], taken["tombstones"], next_positions, has_more
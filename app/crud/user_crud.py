@@ -1,20 +1,34 @@
 # Imports from external libraries
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from passlib.context import CryptContext
+from sqlalchemy.orm import load_only, selectinload, make_transient_to_detached
 
 # Imports from app modules
 from app.models.user import User
 from app.schemas.user import UserCredentials, UserUpdate
-from app.exceptions import UserNotFoundException, InvalidCredentialsException
+from app.exceptions import UserNotFoundException, InvalidCredentialsException, ServiceOverloadedException
+from app.cache import principal_cache
+import app.response_cache as response_cache
+from app.config import settings
+from app.passwords import hash_password, check_password
 
-pwd_context =  CryptContext(schemes=["sha256_crypt"])
+# Imports from standard library
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+import asyncio
+import multiprocessing
+
+# Hashing is CPU bound and passlib's crypt backend holds the GIL for the whole hash, so it runs in a bounded
+# pool of processes instead of the event loop (a thread pool would still stall the loop).
+# Processes are spawned rather than forked, as the worker process already runs threads by then
+password_hash_executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+pending_hash_jobs = 0
 
 async def create_user(session: AsyncSession, user: User) -> User:
     '''
     Creates a new user in the database.
     '''
-    extra_data = {"password": get_password_hash(user.password)}
+    extra_data = {"password": await get_password_hash(user.password)}
     user.sqlmodel_update(extra_data)
     session.add(user)
     await session.commit()
@@ -28,24 +42,70 @@ async def get_user_by_username(session: AsyncSession, username: str) -> User | N
     result = await session.execute(select(User).where(User.username == username))
     return result.scalars().first()
 
-async def get_user_by_id(session: AsyncSession, user_id: int) -> User | None :
+async def get_user_by_id(session: AsyncSession, user_id: int, with_lists: bool = False) -> User | None :
     '''
     Selects a user from the database by their id.
+    User's lists are only loaded when explicitly requested with "with_lists".
     '''
-    result = await session.execute(select(User).where(User.id == user_id))
+    query = select(User).where(User.id == user_id)
+    if with_lists:
+        query = query.options(selectinload(User.lists)) #type: ignore
+    result = await session.execute(query)
     return result.scalars().first()
 
-def get_password_hash(password: str) -> str:
+async def get_user_identity(session: AsyncSession, user_id: int) -> User | None :
+    '''
+    Selects only the identity columns (id and username) of a user by their id.
+    Used by the authentication path, so no relationships or password hash are loaded.
+    Identities are served from the principal cache when possible, as long as the user's shared version is unchanged.
+    '''
+    cache_key = (user_id, await response_cache.shared_user_version(user_id))
+    cached_username = principal_cache.get(cache_key)
+    if cached_username is not None:
+        # A fresh detached instance per request, so it can be attached to the request's session
+        cached_user = User(id=user_id, username=cached_username)
+        make_transient_to_detached(cached_user)
+        return cached_user
+    result = await session.execute(select(User).options(load_only(User.id, User.username)).where(User.id == user_id)) #type: ignore
+    found_user = result.scalars().first()
+    if found_user:
+        principal_cache.set(cache_key, found_user.username)
+    return found_user
+
+async def invalidate_principal(user_id: int) -> None:
+    '''
+    Drops the cached identity of the user in this worker and, by bumping the user's shared version,
+    in the other workers too when the response cache is in Redis.
+    Must be called after the change is committed, so a concurrent request can't cache the old row again meanwhile.
+    '''
+    principal_cache.invalidate((user_id, None))
+    await response_cache.bump_user_version(user_id)
+
+async def run_hash_job(func: Callable[..., Any], *args: Any) -> Any:
+    '''
+    Runs a hashing function in the password hash pool.
+    Raises ServiceOverloadedException instead of queueing when too many jobs are pending.
+    '''
+    global pending_hash_jobs
+    if pending_hash_jobs >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise ServiceOverloadedException("Too many password operations in progress.")
+    pending_hash_jobs += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(password_hash_executor, func, *args)
+    finally:
+        pending_hash_jobs -= 1
+
+async def get_password_hash(password: str) -> str:
     '''
     Hashes a password using the SHA-256 algorithm.
     '''
-    return pwd_context.hash(password)
+    return await run_hash_job(hash_password, password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     '''
     Verifies a password against a hashed password.
     '''
-    return pwd_context.verify(plain_password, hashed_password)
+    return await run_hash_job(check_password, plain_password, hashed_password)
 
 async def authenticate_user(session: AsyncSession, user: UserCredentials) -> User:
     '''
@@ -54,7 +114,7 @@ async def authenticate_user(session: AsyncSession, user: UserCredentials) -> Use
     found_user = await get_user_by_username(session, user.username)
     if not found_user:
         raise UserNotFoundException("Invalid username.")
-    if not verify_password(user.password, found_user.password):
+    if not await verify_password(user.password, found_user.password):
         raise InvalidCredentialsException("Invalid password.")
     return found_user
 
@@ -63,11 +123,12 @@ async def update_user(session: AsyncSession, user: User, updated_data: UserUpdat
     Updates a user in the database.
     '''
     if updated_data.password:
-        updated_data.password = get_password_hash(updated_data.password)
+        updated_data.password = await get_password_hash(updated_data.password)
     new_user_data = updated_data.model_dump(exclude_unset=True)
     user.sqlmodel_update(new_user_data)
     session.add(user)
     await session.commit()
+    await invalidate_principal(user.id)
     await session.refresh(user)
     return user
 
@@ -76,4 +137,6 @@ async def delete_user(session: AsyncSession, user: User) -> None:
     Deletes a user from the database.
     '''
     await session.delete(user)
-    await session.commit()
\ No newline at end of file
+    await session.commit()
+    # Also drops the user's cached responses, as ids of deleted users may be reused
+    await invalidate_principal(user.id)
\ No newline at end of file
@@ -1,39 +1,256 @@
 # Imports from external libraries
 from sqlmodel import SQLModel
+from sqlalchemy import event, inspect, select, func, update
+from sqlalchemy.engine import make_url, Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 
 # Imports from app modules
 from app.models import *
+from app.models.list import List
+from app.models.list_item import ListItem
+from app.models.tombstone import Tombstone
 from app.config import settings
+from app.search import create_search_indexes
 
-def create_db_engine():
+# Imports from standard library
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Any, Iterable
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    '''
+    Queue pool that records how long checkouts wait for a free connection.
+    '''
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.wait_count = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started_at
+            self.wait_count += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+class QueryStats:
+    '''
+    Number of SQL statements executed, and the time spent executing them, while handling one request.
+    '''
+    def __init__(self):
+        self.statement_count = 0
+        self.total_seconds = 0.0
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    '''
+    Times every statement executed by the engine, adds it to the current request's QueryStats
+    and logs the statements slower than SLOW_QUERY_THRESHOLD_MS together with their parameters.
+    '''
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def start_statement_timer(connection, cursor, statement, parameters, context, executemany):
+        context.statement_started_at = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def record_statement(connection, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context.statement_started_at
+        stats = query_stats.get()
+        if stats is not None:
+            stats.statement_count += 1
+            stats.total_seconds += elapsed
+        threshold_ms = settings.SLOW_QUERY_THRESHOLD_MS
+        if threshold_ms > 0 and elapsed * 1000 >= threshold_ms:
+            logger.warning("Slow query", extra={
+                "duration_ms": round(elapsed * 1000, 2),
+                "statement": statement,
+                "parameters": repr(parameters)[:settings.SLOW_QUERY_MAX_PARAMETERS_LENGTH]
+            })
+
+def track_write(session: AsyncSession, now: datetime, list_ids: Iterable[int]) -> None:
+    '''
+    Remembers that the current transaction stamped rows of the given lists (their items and tombstones)
+    with "now", so they can be stamped again if the transaction commits too late for delta sync.
+    '''
+    writes = session.info.setdefault("sync_writes", {"stamps": set(), "list_ids": set()})
+    writes["stamps"].add(now)
+    writes["list_ids"].update(list_ids)
+
+@event.listens_for(Session, "before_commit")
+def restamp_late_writes(session: Session) -> None:
+    '''
+    Delta sync only reads changes older than SYNC_SETTLE_SECONDS, assuming they are committed by then.
+    A transaction that took more than half of that since it stamped its first row (e.g. a large import chunk
+    or an atomic batch) stamps its rows again with the current time right before committing,
+    so the bound holds for every transaction and no change is skipped by a sync.
+    The objects of the session are stamped too, so responses and ETags match what is stored.
+    '''
+    writes = session.info.pop("sync_writes", None)
+    if not writes or not writes["list_ids"]:
+        return
+    now = datetime.now()
+    if now - min(writes["stamps"]) < timedelta(seconds=settings.SYNC_SETTLE_SECONDS / 2):
+        return
+    logger.warning("Stamping the changes of a long transaction again for delta sync", extra={"lists": len(writes["list_ids"])})
+    stamps, list_ids = list(writes["stamps"]), list(writes["list_ids"])
+    for table, list_id_column, stamp_column in (
+        (List, List.id, List.last_modified_at),
+        (ListItem, ListItem.list_id, ListItem.last_modified_at),
+        (Tombstone, Tombstone.list_id, Tombstone.deleted_at)
+    ):
+        session.execute(
+            update(table)
+            .where(list_id_column.in_(list_ids), stamp_column.in_(stamps)) #type: ignore
+            .values({stamp_column.key: now})
+            .execution_options(synchronize_session="evaluate")
+        )
+
+@event.listens_for(Session, "after_rollback")
+def forget_writes(session: Session) -> None:
+    session.info.pop("sync_writes", None)
+
+def create_db_engine() -> AsyncEngine:
+    '''
+    Creates a database engine using the provided DB_URL and pool settings.
+    '''
+    url = make_url(settings.DB_URL)
+    engine_kwargs: dict[str, Any] = {"echo": False}
+    connect_args: dict[str, Any] = {}
+
+    if url.get_backend_name() == "sqlite":
+        connect_args["check_same_thread"] = False
+    if url.get_backend_name() == "postgresql" and url.get_driver_name() == "asyncpg":
+        # asyncpg's own statement cache and SQLAlchemy's prepared statement cache
+        connect_args["statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+        connect_args["prepared_statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+
+    # In-memory SQLite databases live in a single connection, so they keep the dialect's default pool
+    if not (url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")):
+        engine_kwargs.update(
+            poolclass=InstrumentedPool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING
+        )
+
+    engine = create_async_engine(url, connect_args=connect_args, **engine_kwargs)
+
+    if url.get_backend_name() == "sqlite":
+        @event.listens_for(engine.sync_engine, "connect")
+        def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+
+    instrument_engine(engine)
+    return engine
+
+def get_pool_stats(engine: AsyncEngine) -> dict[str, Any]:
     '''
-    Creates a database engine using the provided DB_URL.
+    Returns usage statistics of the engine's connection pool.
     '''
-    if settings.DB_URL.startswith("sqlite"):
-        return create_async_engine(
-            settings.DB_URL,
-            echo=False,
-            connect_args={
-                "check_same_thread": False, 
-                "pragma": {"foreign_keys": 1}
-            }
+    pool = engine.pool
+    stats: dict[str, Any] = {"pool_class": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            max_overflow=settings.DB_MAX_OVERFLOW
+        )
+    if isinstance(pool, InstrumentedPool):
+        stats.update(
+            wait_count=pool.wait_count,
+            total_wait_seconds=pool.total_wait_seconds,
+            avg_wait_seconds=pool.total_wait_seconds / pool.wait_count if pool.wait_count else 0.0,
+            max_wait_seconds=pool.max_wait_seconds
         )
-    return create_async_engine(settings.DB_URL, echo=False)
+    return stats
+
+def create_missing_indexes(connection: Connection) -> None:
+    '''
+    Creates the indexes defined in the models that don't exist yet.
+    "create_all" skips tables that already exist, so this brings older databases up to date.
+    '''
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+def add_list_item_counters(connection: Connection) -> None:
+    '''
+    Adds the item counters to a list table created by an older version and fills them from the existing items.
+    '''
+    existing_columns = {column["name"] for column in inspect(connection).get_columns(List.__tablename__)}
+    missing_columns = [column for column in List.__table__.columns if column.name not in existing_columns] #type: ignore
+    if not missing_columns:
+        return
+    for column in missing_columns:
+        column_ddl = CreateColumn(column).compile(dialect=connection.dialect)
+        connection.exec_driver_sql(f"ALTER TABLE {List.__tablename__} ADD COLUMN {column_ddl}")
+    items_of_list = ListItem.list_id == List.id
+    connection.execute(update(List).values(
+        item_count=select(func.count(ListItem.id)).where(items_of_list).scalar_subquery(), #type: ignore
+        completed_count=select(func.count(ListItem.id)).where(items_of_list, ListItem.is_completed).scalar_subquery() #type: ignore
+    ))
 
 async def create_db_and_tables(engine: AsyncEngine):
     '''
-    Creates the database and all tables defined in the models.
+    Creates the database and all tables, columns and indexes defined in the models, and the search indexes.
     '''
     async with engine.begin() as connection:
         await connection.run_sync(SQLModel.metadata.create_all)
+        await connection.run_sync(add_list_item_counters)
+        await connection.run_sync(create_missing_indexes)
+        await connection.run_sync(create_search_indexes)
+
+class DeferredCommitSession(AsyncSession):
+    '''
+    Session whose "commit" only flushes, so that several operations form a single transaction,
+    which is committed with "commit_deferred" (or rolled back) by whoever created the session.
+    '''
+    async def commit(self) -> None:
+        await self.flush()
+
+    async def commit_deferred(self) -> None:
+        await super().commit()
+
+def create_session() -> AsyncSession:
+    '''
+    Creates a new session on the shared engine.
+    Objects aren't expired on commit, so rows returned by the database stay usable without a refresh.
+    '''
+    return AsyncSession(db_engine, expire_on_commit=False)
 
 async def get_session():
     '''
     handles session dependency.
-    Yields a session, that way one session per request restraint is guaranteed
+    Yields a session, that way one session per request restraint is guaranteed.
+    Operations of a batch request share the batch's session instead.
     '''
-    async with AsyncSession(db_engine) as session:
+    shared_session = batch_session.get()
+    if shared_session is not None:
+        yield shared_session
+        return
+    async with create_session() as session:
         yield session
 
-db_engine = create_db_engine()
\ No newline at end of file
+# Statistics of the request being handled (see middleware.py)
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+# Session shared by the operations of the batch request being processed (see routes/batch.py)
+batch_session: ContextVar[AsyncSession | None] = ContextVar("batch_session", default=None)
+
+# The single engine (and connection pool) shared by the whole process
+db_engine = create_db_engine()
@@ -0,0 +1,60 @@
+# Imports from external libraries
+from fastapi import Request, Response, status
+
+# Imports from standard library
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any
+import hashlib
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Builds a weak ETag from the values a response depends on.
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def to_http_date(moment: datetime) -> str:
+    """
+    Formats a timestamp as an HTTP date. Naive timestamps are treated as local time, like datetime.now() produces them.
+    """
+    return format_datetime(moment.astimezone(timezone.utc), usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None) -> bool:
+    """
+    Checks the request's If-None-Match (or, without it, If-Modified-Since) header against the current version.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison: "W/" prefixes are ignored
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have a one second resolution
+        return last_modified.astimezone(timezone.utc).replace(microsecond=0) <= since
+    return False
+
+
+def cache_headers(etag: str, last_modified: datetime | None) -> dict[str, str]:
+    """
+    Returns the validator headers for a response. Clients must revalidate before reusing it.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = to_http_date(last_modified)
+    return headers
+
+
+def not_modified_response(etag: str, last_modified: datetime | None) -> Response:
+    """
+    Returns an empty 304 Not Modified response carrying the validator headers.
+    """
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag, last_modified))
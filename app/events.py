@@ -0,0 +1,193 @@
+# Imports from external libraries
+from sqlalchemy import select, func, event as sqlalchemy_event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+import orjson
+
+# Imports from app modules
+from app.config import settings
+
+# Imports from standard library
+from collections import defaultdict
+from datetime import datetime
+from typing import Any
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """
+    The queue of events of one open stream.
+    A consumer too slow to keep up with its events is marked as overflowed instead of buffering without bound.
+    """
+
+    def __init__(self, max_size: int):
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(max_size)
+        self.overflowed = False
+
+    def deliver(self, event: dict[str, Any]) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class EventBroker:
+    """
+    Fans the change events of a user out to the user's open streams in this process.
+    """
+
+    # Whether the events are sent in the transaction of the change, instead of dispatched after it commits
+    notifies_in_transaction = False
+
+    def __init__(self):
+        self.subscriptions: defaultdict[int, set[Subscription]] = defaultdict(set)
+
+    def can_subscribe(self, user_id: int) -> bool:
+        return len(self.subscriptions.get(user_id, ())) < settings.EVENTS_MAX_STREAMS_PER_USER
+
+    def subscribe(self, user_id: int) -> Subscription | None:
+        """
+        Opens a subscription to the user's events, or returns None if the user has too many open streams.
+        """
+        if not self.can_subscribe(user_id):
+            return None
+        subscription = Subscription(settings.EVENTS_QUEUE_SIZE)
+        self.subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, user_id: int, subscription: Subscription) -> None:
+        subscriptions = self.subscriptions.get(user_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self.subscriptions[user_id]
+
+    def dispatch(self, user_id: int, event: dict[str, Any]) -> None:
+        for subscription in self.subscriptions.get(user_id, ()):
+            subscription.deliver(event)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "broker": type(self).__name__,
+            "users": len(self.subscriptions),
+            "streams": sum(len(subscriptions) for subscriptions in self.subscriptions.values())
+        }
+
+
+class PostgresEventBroker(EventBroker):
+    """
+    Fans the change events out through PostgreSQL's LISTEN/NOTIFY, so that the streams on every worker
+    receive the changes made through any worker. The notifications are sent by the transactions of the changes,
+    which PostgreSQL only delivers if they commit; every worker keeps one dedicated connection listening to the channel.
+    """
+
+    CHANNEL = "todo_events"
+    RECONNECT_DELAY_SECONDS = 2
+    notifies_in_transaction = True
+
+    def __init__(self, dsn: str):
+        super().__init__()
+        self.dsn = dsn
+        self.connection: Any = None
+        self.stopping = False
+        self.reconnect_task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        await self.connect()
+
+    async def connect(self) -> None:
+        # Only needed with PostgreSQL, where it is the database driver
+        import asyncpg
+
+        self.connection = await asyncpg.connect(self.dsn)
+        await self.connection.add_listener(self.CHANNEL, self.on_notification)
+        self.connection.add_termination_listener(self.on_termination)
+
+    def on_notification(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        message = orjson.loads(payload)
+        self.dispatch(message["user_id"], message["event"])
+
+    def on_termination(self, connection: Any) -> None:
+        if not self.stopping:
+            logger.warning("Lost the event listener connection, reconnecting")
+            self.reconnect_task = asyncio.create_task(self.reconnect())
+
+    async def reconnect(self) -> None:
+        while not self.stopping:
+            await asyncio.sleep(self.RECONNECT_DELAY_SECONDS)
+            try:
+                await self.connect()
+                return
+            except Exception:
+                logger.error("Couldn't reconnect the event listener connection", exc_info=True)
+
+    async def stop(self) -> None:
+        self.stopping = True
+        if self.reconnect_task is not None:
+            self.reconnect_task.cancel()
+        if self.connection is not None and not self.connection.is_closed():
+            await self.connection.close()
+
+
+def create_broker() -> EventBroker:
+    """
+    Creates the LISTEN/NOTIFY broker for PostgreSQL (with asyncpg), or the in-process broker otherwise,
+    which only reaches the streams of the same worker.
+    """
+    url = make_url(settings.DB_URL)
+    if url.get_backend_name() == "postgresql" and url.get_driver_name() == "asyncpg":
+        return PostgresEventBroker(url.set(drivername="postgresql").render_as_string(hide_password=False))
+    return EventBroker()
+
+
+def publish(session: AsyncSession, user_id: int, event_type: str, list_id: int | None, ids: list[int] | None = None) -> None:
+    """
+    Publishes a change of the user's data to the user's open streams once the session's transaction commits
+    (an atomic batch's only when the whole batch does); nothing is published if it's rolled back.
+    Must be called before the change is committed.
+    "ids" are the ids of the changed items (or imported lists); they are left out when there are too many for one notification.
+    """
+    event = {"type": event_type, "list_id": list_id, "at": datetime.now().isoformat()}
+    if ids is not None:
+        event["ids"] = ids if len(ids) <= settings.EVENTS_MAX_IDS else None
+    session.info.setdefault("events", []).append((user_id, event))
+
+
+@sqlalchemy_event.listens_for(Session, "before_commit")
+def notify_events(session: Session) -> None:
+    """
+    Sends the transaction's events with NOTIFY in the transaction itself, so no lock or extra round trip
+    to another connection is needed and the events are delivered exactly when the changes are visible.
+    """
+    if not broker.notifies_in_transaction or "events" not in session.info:
+        return
+    for user_id, event in session.info.pop("events"):
+        payload = orjson.dumps({"user_id": user_id, "event": event}).decode()
+        session.execute(select(func.pg_notify(PostgresEventBroker.CHANNEL, payload)))
+
+
+@sqlalchemy_event.listens_for(Session, "after_commit")
+def dispatch_events(session: Session) -> None:
+    for user_id, event in session.info.pop("events", ()):
+        broker.dispatch(user_id, event)
+
+
+@sqlalchemy_event.listens_for(Session, "after_rollback")
+def forget_events(session: Session) -> None:
+    session.info.pop("events", None)
+
+
+broker = create_broker()
@@ -8,4 +8,22 @@ class InvalidCredentialsException(Exception):
     """
     Exception raised when invalid credentials are provided during authentication.
     """
-    pass
\ No newline at end of file
+    pass
+
+class ServiceOverloadedException(Exception):
+    """
+    Exception raised when a bounded resource is saturated and the request should be retried later.
+    """
+    pass
+
+class InvalidCursorException(Exception):
+    """
+    Exception raised when a pagination cursor is malformed or doesn't match the requested sorting.
+    """
+    pass
+
+class SyncTokenExpiredException(Exception):
+    """
+    Exception raised when a sync token is older than the recorded deletions, so the changes since it can't be listed.
+    """
+    pass
@@ -1,14 +1,23 @@
 # Imports from external libraries
 from fastapi import FastAPI, Request
 from contextlib import asynccontextmanager
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST
 
 # Imports from app modules
-from app.db import create_db_engine, create_db_and_tables
-from app.routes import user, list, list_item
+from app.db import db_engine, create_db_and_tables
+from app.routes import user, list, list_item, admin, export, bulk_import, batch, search, sync, events as events_routes
 from app.logging_config import setup_logging
+from app.exceptions import ServiceOverloadedException
+from app.crud.user_crud import password_hash_executor
+from app.responses import FastJSONResponse
+from app.middleware import RequestInstrumentationMiddleware, MetricsMiddleware, RateLimitMiddleware
+from app.metrics import render_metrics, mark_process_dead
+import app.response_cache as response_cache
+import app.events as events
 
 # Imports from standard library
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,8 +32,15 @@ async def lifespan(app: FastAPI):
     setup_logging()
     logger.info("Starting up...")
     await create_db_and_tables(db_engine)
+    await events.broker.start()
     yield
     logger.info("Shutting down...")
+    await events.broker.stop()
+    # Waits for the worker processes to exit, so their resources are released, without blocking the loop
+    await asyncio.to_thread(password_hash_executor.shutdown, wait=True, cancel_futures=True)
+    await db_engine.dispose()
+    await response_cache.close()
+    mark_process_dead()
 
 # Initialize app, db and essentials
 app = FastAPI(
@@ -37,9 +53,19 @@ This API supports JWT authentication and provides endpoints for creating, retrie
 updating, and deleting lists and list items. Interactive documentation is available
 via Swagger UI (/docs) and ReDoc (/redoc).
 """,
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
-db_engine = create_db_engine()
+
+# The last added middleware runs first, so rejected requests are still logged and counted
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(RequestInstrumentationMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(ServiceOverloadedException)
+async def service_overloaded_exception_handler(request: Request, exc: ServiceOverloadedException):
+    logger.warning(f"Shedding request {request.method} {request.url}: {exc}")
+    return JSONResponse(status_code=503, content={"message": str(exc)}, headers={"Retry-After": "1"})
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -59,9 +85,23 @@ async def get_root():
         "documentation": "/docs"
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """
+    Exposes the application metrics in the Prometheus text format.
+    """
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
 app.include_router(user.router)
 app.include_router(list.router)
 app.include_router(list_item.router)
+app.include_router(export.router)
+app.include_router(bulk_import.router)
+app.include_router(batch.router)
+app.include_router(search.router)
+app.include_router(sync.router)
+app.include_router(events_routes.router)
+app.include_router(admin.router)
 
 if __name__ == "__main__":
     import uvicorn
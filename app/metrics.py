@@ -0,0 +1,81 @@
+# Imports from external libraries
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Imports from app modules
+from app.cache import principal_cache
+from app.db import db_engine, InstrumentedPool
+
+# Imports from standard library
+import os
+
+# With several workers every process writes its samples to files in this directory,
+# which are aggregated when /metrics is scraped from any of them
+MULTIPROCESS_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Latency of HTTP requests by route.", ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+REQUESTS = Counter("http_requests_total", "HTTP requests by route and status code.", ["method", "route", "status_code"])
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests being handled.", ["method"], multiprocess_mode="livesum"
+)
+
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections", "Database connections of the pool by state.", ["state"], multiprocess_mode="livesum"
+)
+DB_POOL_WAIT_SECONDS = Gauge(
+    "db_pool_checkout_wait_seconds", "Total time spent waiting for a pool connection.", multiprocess_mode="livesum"
+)
+AUTH_CACHE_LOOKUPS = Gauge(
+    "auth_cache_lookups", "Authenticated-principal cache lookups by result.", ["result"], multiprocess_mode="livesum"
+)
+AUTH_CACHE_HIT_RATIO = Gauge(
+    "auth_cache_hit_ratio", "Hit ratio of the authenticated-principal cache, per process.", multiprocess_mode="liveall"
+)
+
+
+def route_label(scope: dict) -> str:
+    """
+    Returns the path template of the route that handled the request, so that e.g. all lists share one label.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+def update_process_gauges() -> None:
+    """
+    Copies the current connection pool and cache statistics of this process to their gauges.
+    """
+    pool = db_engine.pool
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        DB_POOL_CONNECTIONS.labels("checked_out").set(pool.checkedout())
+        DB_POOL_CONNECTIONS.labels("checked_in").set(pool.checkedin())
+        DB_POOL_CONNECTIONS.labels("overflow").set(max(pool.overflow(), 0))
+    if isinstance(pool, InstrumentedPool):
+        DB_POOL_WAIT_SECONDS.set(pool.total_wait_seconds)
+    cache_stats = principal_cache.stats()
+    AUTH_CACHE_LOOKUPS.labels("hit").set(cache_stats["hits"])
+    AUTH_CACHE_LOOKUPS.labels("miss").set(cache_stats["misses"])
+    AUTH_CACHE_HIT_RATIO.set(cache_stats["hit_ratio"])
+
+
+def render_metrics() -> bytes:
+    """
+    Renders the metrics in the Prometheus text format, aggregated over all worker processes in multiprocess mode.
+    """
+    update_process_gauges()
+    if MULTIPROCESS_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def mark_process_dead() -> None:
+    """
+    Removes the live gauges of this process from the aggregation when the worker shuts down.
+    """
+    if MULTIPROCESS_DIR:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,166 @@
+# Imports from external libraries
+from starlette.types import ASGIApp, Scope, Receive, Send, Message
+from starlette.datastructures import MutableHeaders, Headers
+from fastapi.responses import JSONResponse
+
+# Imports from app modules
+from app.db import QueryStats, query_stats
+from app.config import settings
+from app.metrics import REQUEST_LATENCY, REQUESTS, REQUESTS_IN_PROGRESS, route_label, update_process_gauges
+from app.rate_limit import user_limiter, ip_limiter, expensive_routes_limiter, retry_after_header
+from app.utils import decode_access_token_user_id
+
+# Imports from standard library
+import logging
+import time
+
+logger = logging.getLogger("app.access")
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Collects the SQL statement count and database time of every request, reports them
+    in a Server-Timing header and logs them with the request's status and duration once it completes.
+    Streamed responses send their headers before streaming, so the header only covers the statements executed up to then.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = query_stats.set(stats)
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", server_timing(stats, time.perf_counter() - started_at))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            query_stats.reset(token)
+            logger.info("Request completed", extra={
+                "method": scope["method"],
+                "path": scope["path"],
+                "status_code": status_code,
+                "duration_ms": round((time.perf_counter() - started_at) * 1000, 2),
+                "db_statements": stats.statement_count,
+                "db_time_ms": round(stats.total_seconds * 1000, 2)
+            })
+
+
+def server_timing(stats: QueryStats, elapsed_seconds: float) -> str:
+    """
+    Formats the Server-Timing header value with the database and total time of the request.
+    """
+    return (
+        f'db;dur={stats.total_seconds * 1000:.2f};desc="{stats.statement_count} statements", '
+        f"total;dur={elapsed_seconds * 1000:.2f}"
+    )
+
+
+class MetricsMiddleware:
+    """
+    Records the latency, status code and number of in-flight requests of every request,
+    labelled by route, for the Prometheus metrics.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # The router stores the matched route in the scope
+            route = route_label(scope)
+            REQUEST_LATENCY.labels(method, route).observe(time.perf_counter() - started_at)
+            REQUESTS.labels(method, route, str(status_code)).inc()
+            update_process_gauges()
+
+
+class RateLimitMiddleware:
+    """
+    Admission control protecting the database: token buckets per client IP and per user (the "user_id" claim
+    of the access token), and a cap on the number of requests handled at once by the expensive routes.
+    Requests over a limit are answered with 429 and a Retry-After header without reaching the application.
+    """
+
+    EXEMPT_PATHS = {"/", "/metrics"}
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED or scope["path"] in self.EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        retry_after = ip_limiter.acquire(client[0] if client else None)
+        if not retry_after:
+            user_id = bearer_user_id(scope)
+            if user_id is not None:
+                retry_after = user_limiter.acquire(user_id)
+        if retry_after:
+            response = too_many_requests("Rate limit exceeded, retry later.", retry_after)
+            await response(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if not any(path == route or path.startswith(route + "/") for route in settings.EXPENSIVE_ROUTES):
+            await self.app(scope, receive, send)
+            return
+        if not expensive_routes_limiter.try_acquire():
+            response = too_many_requests("Too many expensive requests in progress, retry later.", 1)
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            expensive_routes_limiter.release()
+
+
+def bearer_user_id(scope: Scope) -> int | None:
+    """
+    Returns the user id of the request's bearer access token, or None without a valid one.
+    """
+    authorization = Headers(scope=scope).get("authorization")
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return decode_access_token_user_id(token)
+
+
+def too_many_requests(message: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(status_code=429, content={"message": message}, headers={"Retry-After": retry_after_header(retry_after)})
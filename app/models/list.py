@@ -1,5 +1,6 @@
 # Imports from external libraries
 from sqlmodel import Field, SQLModel, Relationship
+from sqlalchemy import Index
 
 # Imports from standard library
 from datetime import datetime
@@ -13,11 +14,24 @@ if TYPE_CHECKING:
     from app.models.user import User
 
 class List(SQLModel, table=True):
+    # Match the owner filter followed by each supported sorting, with the id as tie breaker
+    __table_args__ = (
+        Index("ix_list_user_id_id", "user_id", "id"),
+        Index("ix_list_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_list_user_id_name_id", "user_id", "name", "id"),
+        # Delta sync reads the owner's changes in modification order
+        Index("ix_list_user_id_last_modified_at_id", "user_id", "last_modified_at", "id"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     name: str
     created_at: datetime = Field(default_factory=datetime.now)
     last_modified_at: datetime = Field(default_factory=datetime.now)
     user_id: int = Field(foreign_key="user.id", ondelete="CASCADE")
+    # Denormalized from the list's items and kept up to date by every write to them,
+    # so listing lists doesn't need to count items
+    item_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    completed_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
 
     user: 'User' = Relationship(back_populates="lists")
     list_items: list['ListItem'] | None = Relationship(back_populates="list", 
@@ -28,6 +42,8 @@ class ListPublic(SQLModel):
     name: str
     created_at: datetime
     last_modified_at: datetime
+    item_count: int
+    completed_count: int
 
 class SortBy(str, Enum):
     sort_name = "name"
@@ -1,5 +1,6 @@
 # IMports from external libraries
 from sqlmodel import Field, SQLModel, Relationship
+from sqlalchemy import Index
 from typing import TYPE_CHECKING
 
 
@@ -11,6 +12,13 @@ if TYPE_CHECKING:
 from datetime import datetime
 
 class ListItem(SQLModel, table=True):
+    # Matches listing a list's items oldest first, with the id as tie breaker
+    __table_args__ = (
+        Index("ix_listitem_list_id_created_at_id", "list_id", "created_at", "id"),
+        # Matches reading the changes of a list's items in modification order for delta sync
+        Index("ix_listitem_list_id_last_modified_at_id", "list_id", "last_modified_at", "id"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.now)
     content: str
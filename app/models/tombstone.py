@@ -0,0 +1,30 @@
+# Imports from external libraries
+from sqlmodel import Field, SQLModel
+from sqlalchemy import Index
+
+# Imports from standard library
+from datetime import datetime
+from enum import Enum
+
+class TombstoneEntity(str, Enum):
+    list = "list"
+    list_item = "list_item"
+
+class Tombstone(SQLModel, table=True):
+    # Records deletions for delta sync, read by owner in deletion order
+    __table_args__ = (
+        Index("ix_tombstone_user_id_deleted_at_id", "user_id", "deleted_at", "id"),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    entity: TombstoneEntity
+    entity_id: int
+    list_id: int
+    deleted_at: datetime = Field(default_factory=datetime.now)
+    user_id: int = Field(foreign_key="user.id", ondelete="CASCADE")
+
+class TombstonePublic(SQLModel):
+    entity: TombstoneEntity
+    entity_id: int
+    list_id: int
+    deleted_at: datetime
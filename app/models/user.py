@@ -15,9 +15,11 @@ class User(SQLModel, table=True):
     username: str = Field(index=True, unique=True)
     password: str
 
+    # Lists are loaded only on request (see user_crud.get_user_by_id(with_lists=True)),
+    # so resolving the current user doesn't pull every list the user owns.
     lists: list['List'] | None = Relationship(back_populates="user", 
                                                 cascade_delete=True,
-                                                sa_relationship_kwargs={"lazy": "selectin"})
+                                                sa_relationship_kwargs={"lazy": "select"})
     
 class UserPublic(SQLModel):
     id: int
@@ -0,0 +1,140 @@
+# Imports from external libraries
+from sqlalchemy import tuple_, ColumnElement, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Imports from app modules
+from app.exceptions import InvalidCursorException
+
+# Imports from standard library
+from datetime import datetime
+from typing import Any
+import base64
+import binascii
+import json
+
+# Types of the sort value held by cursors per sorted column; cursors of the id sorting hold no value
+CURSOR_VALUE_TYPES: dict[str, type | None] = {"id": None, "name": str, "created_at": datetime}
+# Ids are compared against 64-bit integer columns
+MAX_ID = 2 ** 63 - 1
+
+
+def valid_id(row_id: Any) -> bool:
+    return isinstance(row_id, int) and not isinstance(row_id, bool) and -MAX_ID - 1 <= row_id <= MAX_ID
+
+
+def encode_cursor(sort_spec: str, key: tuple[Any, int]) -> str:
+    """
+    Encodes the keyset position (sort value, id) of the last row of a page into an opaque cursor.
+    """
+    value, row_id = key
+    if CURSOR_VALUE_TYPES.get(sort_spec.split(":")[0]) is None:
+        value = None
+    elif isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    payload = json.dumps({"s": sort_spec, "v": value, "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_spec: str) -> tuple[Any, int]:
+    """
+    Decodes an opaque cursor back into a keyset position (sort value, id).
+    Raises InvalidCursorException if the cursor is malformed or was issued for another sorting.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        issued_for, value, row_id = payload["s"], payload["v"], payload["id"]
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value["dt"])
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError, AttributeError):
+        raise InvalidCursorException("Malformed cursor.")
+    if issued_for != sort_spec:
+        raise InvalidCursorException("The cursor doesn't match the requested sorting.")
+    value_type = CURSOR_VALUE_TYPES.get(sort_spec.split(":")[0])
+    if value_type is None:
+        # Cursors issued before the id sorting dropped its value still carry the id there
+        value = None
+    elif not isinstance(value, value_type):
+        raise InvalidCursorException("Malformed cursor.")
+    if not valid_id(row_id):
+        raise InvalidCursorException("Malformed cursor.")
+    return value, row_id
+
+
+def encode_sync_token(positions: dict[str, tuple[datetime, int]]) -> str:
+    """
+    Encodes the keyset positions (modification time, id) reached in each change stream into an opaque sync token.
+    """
+    payload = json.dumps(
+        {stream: [{"dt": value.isoformat()}, row_id] for stream, (value, row_id) in positions.items()},
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_sync_token(token: str, streams: tuple[str, ...]) -> dict[str, tuple[datetime, int]]:
+    """
+    Decodes a sync token back into the keyset position reached in each of the given change streams.
+    Raises InvalidCursorException if the token is malformed.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        positions = {}
+        for stream in streams:
+            value, row_id = payload[stream]
+            if not valid_id(row_id):
+                raise ValueError(row_id)
+            positions[stream] = (datetime.fromisoformat(value["dt"]), row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError, AttributeError):
+        raise InvalidCursorException("Malformed sync token.")
+    return positions
+
+
+def keyset_condition(sort_column: Any, id_column: Any, after: tuple[Any, int], descending: bool) -> ColumnElement[bool]:
+    """
+    Builds the seek condition selecting the rows that come after the given (sort value, id) position.
+    """
+    if sort_column is id_column:
+        return id_column < after[1] if descending else id_column > after[1]
+    if descending:
+        return tuple_(sort_column, id_column) < after
+    return tuple_(sort_column, id_column) > after
+
+
+async def fetch_page(
+        session: AsyncSession,
+        query: Select[Any],
+        count_query: Select[Any],
+        page: int,
+        page_size: int,
+        after: tuple[Any, int] | None,
+        include_total: bool = True
+) -> tuple[list[Any], int | None, bool]:
+    """
+    Fetches one page of an ordered query together with the total number of matching rows in a single statement.
+    The query must already contain the seek condition when "after" is given; otherwise the page is selected by offset.
+    The total is None when "include_total" is False.
+    Returns the page rows, the total and whether there are more rows after the page.
+    """
+    if include_total:
+        # An uncorrelated subquery, evaluated once. A COUNT(*) OVER () window would make the database
+        # materialize and sort all matching rows instead of reading the page from the sort index,
+        # and with seeking it would only count the rows after the cursor
+        query = query.add_columns(count_query.scalar_subquery().label("total_items"))
+    if not after:
+        query = query.offset((page - 1) * page_size)
+    rows = (await session.execute(query.limit(page_size + 1))).all()
+
+    total_items = None
+    if include_total:
+        if rows:
+            total_items = rows[0][1]
+        elif page == 1 and not after:
+            total_items = 0
+        else:
+            # Past the last page there is no row to carry the total
+            total_items = (await session.execute(count_query)).scalar_one()
+
+    has_more = len(rows) > page_size
+    return [row[0] for row in rows[:page_size]], total_items, has_more
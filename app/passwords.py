@@ -0,0 +1,19 @@
+# Imports from external libraries
+from passlib.context import CryptContext
+
+# Hashing runs in the worker processes of the password hash pool (see crud/user_crud.py),
+# which import only this module, so it must stay free of app imports
+
+pwd_context = CryptContext(schemes=["sha256_crypt"])
+
+def hash_password(password: str) -> str:
+    '''
+    Hashes a password using the SHA-256 algorithm.
+    '''
+    return pwd_context.hash(password)
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    '''
+    Verifies a password against a hashed password.
+    '''
+    return pwd_context.verify(plain_password, hashed_password)
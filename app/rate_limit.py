@@ -0,0 +1,76 @@
+# Imports from app modules
+from app.config import settings
+
+# Imports from standard library
+from collections import OrderedDict
+from typing import Hashable
+import math
+import time
+
+
+class TokenBucketLimiter:
+    """
+    Token buckets per key, refilled at "rate" tokens per second up to "burst" tokens, one token per request
+    (or per operation of a batch).
+    Buckets are refilled lazily when used, so every check is O(1), and at most "max_keys" buckets are kept:
+    the least recently used bucket is dropped, which only resets that key to a full bucket.
+    """
+
+    def __init__(self, rate: float, burst: float, max_keys: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[Hashable, tuple[float, float]] = OrderedDict()
+
+    def acquire(self, key: Hashable, cost: float = 1) -> float:
+        """
+        Takes "cost" tokens from the key's bucket, at most a full bucket so any cost can eventually be paid.
+        Returns 0 if the request is allowed, otherwise the number of seconds until enough tokens are available.
+        """
+        cost = min(cost, self.burst)
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return 0.0 if allowed else (cost - tokens) / self.rate
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class ConcurrencyLimiter:
+    """
+    Caps the number of requests handled at the same time, rejecting the ones over the cap instead of queueing them.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= self.max_concurrency:
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+
+def retry_after_header(seconds: float) -> str:
+    """
+    Formats a wait time as a Retry-After value, in whole seconds, at least one.
+    """
+    return str(max(1, math.ceil(seconds)))
+
+
+user_limiter = TokenBucketLimiter(settings.RATE_LIMIT_USER_PER_SECOND, settings.RATE_LIMIT_USER_BURST, settings.RATE_LIMIT_MAX_KEYS)
+ip_limiter = TokenBucketLimiter(settings.RATE_LIMIT_IP_PER_SECOND, settings.RATE_LIMIT_IP_BURST, settings.RATE_LIMIT_MAX_KEYS)
+# Routes whose requests each hold a connection or the CPU for long, e.g. streaming a whole export
+expensive_routes_limiter = ConcurrencyLimiter(settings.EXPENSIVE_ROUTES_MAX_CONCURRENCY)
@@ -0,0 +1,193 @@
+# Imports from external libraries
+from fastapi import Request, Response
+import orjson
+
+# Imports from app modules
+from app.cache import TTLCache
+from app.etag import is_not_modified, cache_headers, not_modified_response
+from app.config import settings
+from app.db import batch_session, DeferredCommitSession
+
+# Imports from standard library
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """
+    In-process LRU storage of cached responses and user versions.
+    With several workers every process has its own copy, so a change is only seen
+    by the process that handled it; use the Redis backend then.
+    """
+
+    # Whether the user versions are shared by all workers
+    shared = False
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.entries: TTLCache[bytes] = TTLCache(max_size, ttl_seconds)
+        self.versions: dict[int, int] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        self.entries.set(key, value)
+
+    async def get_version(self, user_id: int) -> int:
+        return self.versions.get(user_id, 0)
+
+    async def bump_version(self, user_id: int) -> None:
+        self.versions[user_id] = self.versions.get(user_id, 0) + 1
+
+    async def close(self) -> None:
+        pass
+
+    def stats(self) -> dict[str, Any]:
+        return {"backend": "memory", **self.entries.stats()}
+
+
+class RedisBackend:
+    """
+    Storage of cached responses and user versions in a Redis-compatible server, shared by all workers.
+    Requires the "redis" package.
+    """
+
+    # Versions outlive cached responses by far, so an expired version can't bring back a stale response
+    VERSION_TTL_SECONDS = 30 * 24 * 3600
+    shared = True
+
+    def __init__(self, url: str, ttl_seconds: int):
+        # Only needed when this backend is configured
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> bytes | None:
+        value = await self.client.get(f"todo:response:{key}")
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self.client.set(f"todo:response:{key}", value, ex=self.ttl_seconds)
+
+    async def get_version(self, user_id: int) -> int:
+        return int(await self.client.get(f"todo:version:{user_id}") or 0)
+
+    async def bump_version(self, user_id: int) -> None:
+        async with self.client.pipeline(transaction=True) as pipeline:
+            pipeline.incr(f"todo:version:{user_id}")
+            pipeline.expire(f"todo:version:{user_id}", self.VERSION_TTL_SECONDS)
+            await pipeline.execute()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
+
+
+def create_backend() -> MemoryBackend | RedisBackend | None:
+    """
+    Creates the configured backend, or None when the response cache is disabled.
+    """
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return None
+    if settings.RESPONSE_CACHE_REDIS_URL:
+        return RedisBackend(settings.RESPONSE_CACHE_REDIS_URL, settings.RESPONSE_CACHE_TTL_SECONDS)
+    return MemoryBackend(settings.RESPONSE_CACHE_MAX_SIZE, settings.RESPONSE_CACHE_TTL_SECONDS)
+
+
+async def bump_user_version(user_id: int) -> None:
+    """
+    Invalidates all cached responses of the user by moving to a new version,
+    so the keys of the old responses are never looked up again.
+    Must be called after the change is committed: a response built before the commit is stored under the old version.
+    """
+    if backend is None:
+        return
+    try:
+        await backend.bump_version(user_id)
+    except Exception:
+        logger.error(f"Couldn't bump the response cache version of user {user_id}", exc_info=True)
+
+
+async def shared_user_version(user_id: int) -> int | None:
+    """
+    Returns the user's current version when the versions are shared by all workers (the Redis backend), otherwise None.
+    Lets the caches of each worker notice the changes made through the other workers.
+    """
+    if backend is None or not backend.shared:
+        return None
+    try:
+        return await backend.get_version(user_id)
+    except Exception:
+        logger.error(f"Couldn't read the response cache version of user {user_id}", exc_info=True)
+        return None
+
+
+async def cached_response(request: Request, user_id: int, build_response: Callable[[], Awaitable[Response]]) -> Response:
+    """
+    Returns the user's cached response for the request's path and query parameters,
+    answering conditional requests from it as well, or builds the response and caches it.
+    Only successful responses with an ETag are cached.
+    Responses within an atomic batch are neither served from nor stored in the cache,
+    as they are built from changes that may still be rolled back.
+    """
+    if backend is None or isinstance(batch_session.get(), DeferredCommitSession):
+        return await build_response()
+    try:
+        # Read before building, so that a response built from data changed meanwhile is stored under the outdated version
+        version = await backend.get_version(user_id)
+        query = "&".join(sorted(request.url.query.split("&"))) if request.url.query else ""
+        key = f"{user_id}:{version}:{request.url.path}?{query}"
+        entry = await backend.get(key)
+    except Exception:
+        logger.error("Couldn't read from the response cache", exc_info=True)
+        return await build_response()
+
+    if entry is not None:
+        meta, body = entry.split(b"\n", 1)
+        validators = orjson.loads(meta)
+        etag = validators["etag"]
+        last_modified = parsedate_to_datetime(validators["last_modified"]) if validators["last_modified"] else None
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        return Response(body, media_type="application/json", headers=cache_headers(etag, last_modified))
+
+    response = await build_response()
+    etag = response.headers.get("etag")
+    if response.status_code == 200 and etag and len(response.body) <= settings.RESPONSE_CACHE_MAX_ENTRY_BYTES:
+        meta = orjson.dumps({"etag": etag, "last_modified": response.headers.get("last-modified")})
+        try:
+            await backend.set(key, meta + b"\n" + response.body)
+        except Exception:
+            logger.error("Couldn't write to the response cache", exc_info=True)
+    return response
+
+
+def stats() -> dict[str, Any] | None:
+    return backend.stats() if backend is not None else None
+
+
+async def close() -> None:
+    if backend is not None:
+        await backend.close()
+
+
+backend = create_backend()
@@ -0,0 +1,21 @@
+# Imports from external libraries
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+import orjson
+
+# Imports from standard library
+from typing import Any
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered without the standard library encoder.
+    Pydantic models are serialized straight to JSON bytes by pydantic-core, anything else is encoded with orjson.
+    Routes that return this response skip FastAPI's second validation against "response_model",
+    which is then only used for the documentation.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
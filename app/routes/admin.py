@@ -0,0 +1,32 @@
+# Imports from external libraries
+from fastapi import APIRouter, Depends
+
+# Imports from app modules
+from app.schemas.base import *
+from app.responses import FastJSONResponse
+from app.cache import principal_cache
+from app.db import db_engine, get_pool_stats
+from app.utils import verify_admin_key
+import app.response_cache as response_cache
+import app.events as events
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(verify_admin_key)])
+
+
+@router.get("/stats",
+            summary="Retrieve runtime statistics",
+            description="""
+Retrieves runtime statistics of the current worker process.
+
+- **Authorization**: Requires the admin API key in the *X-Admin-Key* header.
+
+Returns the database connection pool usage, the authenticated-principal and response cache counters and the number of open event streams.
+""",
+            response_model=ResponseWithData[dict])
+async def get_stats():
+    return FastJSONResponse(ResponseWithData(message="Stats retrieved successfully", data={
+        "db_pool": get_pool_stats(db_engine),
+        "auth_cache": principal_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "event_streams": events.broker.stats()
+    }))
@@ -0,0 +1,187 @@
+# Imports from external libraries
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+import orjson
+
+# Imports from app modules
+from app.schemas.batch import *
+from app.schemas.base import *
+from app.responses import FastJSONResponse
+from app.models.user import User
+from app.db import create_session, DeferredCommitSession, db_engine, batch_session, query_stats
+from app.metrics import REQUEST_LATENCY, REQUESTS, route_label
+from app.utils import get_current_user, batch_user
+from app.config import settings
+from app.rate_limit import user_limiter, ip_limiter, retry_after_header
+import app.response_cache as response_cache
+
+# Imports from standard library
+from typing import Any
+from urllib.parse import urlencode
+import logging
+import time
+
+# CONSTANTS
+ALLOWED_PATH_PREFIX = "/lists"
+
+logger = logging.getLogger(__name__)
+access_logger = logging.getLogger("app.access")
+
+router = APIRouter(prefix="/batch", tags=["Batch"])
+
+
+async def dispatch(request: Request, operation: BatchOperation) -> BatchOperationResult:
+    """
+    Runs one operation through the application's router, in the current context, and captures its response.
+    The operation doesn't pass through the middleware, so its metrics and access log line are recorded here.
+    """
+    body = orjson.dumps(operation.body) if operation.body is not None else b""
+    scope = {
+        "type": "http",
+        "asgi": request.scope["asgi"],
+        "http_version": "1.1",
+        "method": operation.method,
+        "scheme": request.scope["scheme"],
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": operation.path,
+        "raw_path": operation.path.encode(),
+        "query_string": urlencode(operation.query or {}, doseq=True).encode(),
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "app": request.app,
+        # HTTPException and the other handled exceptions are turned into responses as usual
+        "starlette.exception_handlers": request.scope.get("starlette.exception_handlers", ({}, {}))
+    }
+    body_sent = False
+
+    async def receive() -> dict[str, Any]:
+        nonlocal body_sent
+        if body_sent:
+            return {"type": "http.disconnect"}
+        body_sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    response_status = 500
+    response_body = bytearray()
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal response_status
+        if message["type"] == "http.response.start":
+            response_status = message["status"]
+        elif message["type"] == "http.response.body":
+            response_body.extend(message.get("body", b""))
+
+    stats = query_stats.get()
+    statements_before, db_seconds_before = (stats.statement_count, stats.total_seconds) if stats else (0, 0.0)
+    started_at = time.perf_counter()
+    try:
+        await request.app.router(scope, receive, send)
+    except Exception:
+        logger.error(f"Unhandled exception for batch operation {operation.method} {operation.path}", exc_info=True)
+        response_status = 500
+        response_body = bytearray(orjson.dumps({"message": "Internal server error"}))
+    finally:
+        elapsed = time.perf_counter() - started_at
+        # The router stores the matched route in the scope, so operations are labelled like the same requests
+        route = route_label(scope)
+        REQUEST_LATENCY.labels(operation.method, route).observe(elapsed)
+        REQUESTS.labels(operation.method, route, str(response_status)).inc()
+        # The statements also count towards the batch request's own Server-Timing header and log line
+        access_logger.info("Batch operation completed", extra={
+            "method": operation.method,
+            "path": operation.path,
+            "status_code": response_status,
+            "duration_ms": round(elapsed * 1000, 2),
+            "db_statements": stats.statement_count - statements_before if stats else 0,
+            "db_time_ms": round((stats.total_seconds - db_seconds_before) * 1000, 2) if stats else 0.0
+        })
+    return BatchOperationResult(status=response_status, body=orjson.loads(response_body) if response_body else None)
+
+
+def charge_operations(request: Request, user_id: int, operations: int) -> None:
+    """
+    The operations are dispatched to the router directly, past the rate limiting middleware, which only charged
+    the batch request itself. Charges the rest of them to the client's and the user's buckets, so a batch
+    costs as much as sending its operations one by one.
+    """
+    if not settings.RATE_LIMIT_ENABLED or operations <= 1:
+        return
+    client = request.scope.get("client")
+    retry_after = ip_limiter.acquire(client[0] if client else None, operations - 1) or user_limiter.acquire(user_id, operations - 1)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded by the batch operations, retry later.",
+            headers={"Retry-After": retry_after_header(retry_after)}
+        )
+
+
+@router.post("",
+             summary="Run several operations in one request",
+             description=f"""
+Runs several list and list item operations in one request, in order, e.g. to sync offline edits.
+
+- **Authorization**: Requires a valid JWT token in the *Authorization* header. The operations run as the authenticated user.
+- **Body Parameters**:
+  - *operations*: Up to {settings.BATCH_MAX_OPERATIONS} operations, each with a *method* (GET, POST, PATCH or DELETE),
+    a *path* starting with {ALLOWED_PATH_PREFIX}, and optionally *query* parameters and a JSON *body*, as for the corresponding endpoint.
+  - *atomic* [optional]: When true, all operations run in a single transaction. The batch stops at the first failed operation
+    and then none of the changes are saved (default is false, where every operation is saved on its own).
+
+Every operation is recorded in the request metrics and the access log like a request to its endpoint,
+and counts against the rate limits as a request of its own; a batch over them is rejected with 429 before any operation runs.
+
+Returns the status and body of every operation that ran, and whether the changes were saved.
+""",
+             response_model=ResponseWithData[BatchResult])
+async def run_batch(
+    request: Request,
+    batch: BatchRequest = Body(..., example={
+        "atomic": True,
+        "operations": [
+            {"method": "POST", "path": "/lists", "body": {"name": "Groceries", "list_items": ["Milk"]}},
+            {"method": "PATCH", "path": "/lists/1/items/2", "body": {"is_completed": True}},
+            {"method": "GET", "path": "/lists", "query": {"page_size": 20}}
+        ]
+    }),
+    current_user: User = Depends(get_current_user)
+):
+    if len(batch.operations) > settings.BATCH_MAX_OPERATIONS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"A batch can contain at most {settings.BATCH_MAX_OPERATIONS} operations.")
+    for operation in batch.operations:
+        if not (operation.path == ALLOWED_PATH_PREFIX or operation.path.startswith(ALLOWED_PATH_PREFIX + "/")) or "?" in operation.path:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Operation paths must start with {ALLOWED_PATH_PREFIX} and pass query parameters in 'query'.")
+    charge_operations(request, current_user.id, len(batch.operations))
+
+    results: list[BatchOperationResult] = []
+    session: AsyncSession = DeferredCommitSession(db_engine, expire_on_commit=False) if batch.atomic else create_session()
+    user_token = batch_user.set(current_user)
+    session_token = batch_session.set(session)
+    try:
+        async with session:
+            for operation in batch.operations:
+                result = await dispatch(request, operation)
+                results.append(result)
+                if result.status >= 400 and batch.atomic:
+                    break
+                if result.status >= 500:
+                    # Leave a clean session for the next operation
+                    await session.rollback()
+            committed = not batch.atomic or all(result.status < 400 for result in results)
+            if batch.atomic:
+                if committed:
+                    # Also publishes the events of all the operations, which are only announced once committed
+                    await session.commit_deferred() #type: ignore
+                else:
+                    await session.rollback()
+    finally:
+        if batch.atomic:
+            # The operations bumped the version before their changes were committed or rolled back,
+            # so responses cached meanwhile by other requests are dropped either way
+            await response_cache.bump_user_version(current_user.id)
+        batch_session.reset(session_token)
+        batch_user.reset(user_token)
+
+    message = "Batch completed successfully" if committed else "Batch failed, no changes were saved"
+    return FastJSONResponse(ResponseWithData(message=message, data=BatchResult(results=results, committed=committed)))
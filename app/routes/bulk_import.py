@@ -0,0 +1,135 @@
+# Imports from external libraries
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from pydantic import ValidationError
+
+# Imports from app modules
+from app.schemas.list import *
+from app.schemas.base import *
+from app.responses import FastJSONResponse
+import app.crud.list_crud as list_crud
+from app.models.user import User
+from app.db import get_session
+from app.utils import get_current_user
+from app.config import settings
+
+# Imports from standard library
+from typing import AsyncIterator
+import logging
+
+# CONSTANTS
+MAX_LINE_BYTES = 8 * 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/import", tags=["Import"])
+
+
+async def read_lines(request: Request) -> AsyncIterator[bytes | None]:
+    """
+    Yields the lines of the streamed request body without reading the whole body into memory.
+    Only each new chunk is split; the start of an unfinished line is kept in pieces, joined once its end arrives.
+    A line longer than MAX_LINE_BYTES is yielded as None and the rest of the body isn't read.
+    """
+    pieces: list[bytes] = []
+    pieces_size = 0
+    async for chunk in request.stream():
+        *lines, rest = chunk.split(b"\n")
+        for line in lines:
+            if pieces:
+                line = b"".join(pieces) + line
+                pieces, pieces_size = [], 0
+            if len(line) > MAX_LINE_BYTES:
+                yield None
+                return
+            yield line
+        if rest:
+            pieces.append(rest)
+            pieces_size += len(rest)
+            if pieces_size > MAX_LINE_BYTES:
+                yield None
+                return
+    if pieces:
+        yield b"".join(pieces)
+
+
+@router.post("",
+             summary="Import lists and list items",
+             description=f"""
+Creates to-do lists with their items from an NDJSON body (one JSON object per line).
+
+- **Authorization**: Requires a valid JWT token in the *Authorization* header.
+- **Body**: Each non-empty line is a list in the same format as for creating a list:
+  - *name*: The title of the to-do list.
+  - *list_items* [optional]: An array of strings representing the content for each list item.
+
+Lists are written in chunks of up to {settings.IMPORT_CHUNK_SIZE} lists or {settings.IMPORT_CHUNK_MAX_ITEMS} items,
+each in its own transaction. Invalid lines are skipped, and a chunk that fails to be written is rolled back
+without affecting the other chunks. A line longer than {MAX_LINE_BYTES} bytes stops the import: the lists before it
+are still created and the line is reported as an error.
+
+Returns the number of created lists and items, along with the progress and errors of every chunk.
+""",
+             response_model=ResponseWithData[ImportResult],
+             openapi_extra={"requestBody": {"required": True, "content": {"application/x-ndjson": {
+                 "schema": {"type": "string"},
+                 "example": '{"name": "My Daily Tasks", "list_items": ["Buy groceries"]}\n{"name": "Work"}\n'
+             }}}})
+async def import_lists(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    user_id = current_user.id
+    chunks: list[ImportChunkResult] = []
+    pending: list[ListCreate] = []
+    pending_items = 0
+    errors: list[ImportLineError] = []
+    first_line = 1
+    line_number = 0
+
+    async def write_chunk() -> None:
+        nonlocal pending, pending_items, errors, first_line
+        lists_created, items_created = 0, 0
+        if pending:
+            try:
+                lists_created, items_created = await list_crud.import_lists(session, pending, user_id)
+            except SQLAlchemyError:
+                await session.rollback()
+                logger.error(f"Import chunk {len(chunks) + 1} of user {user_id} failed", exc_info=True)
+                errors.append(ImportLineError(line=None, error="The chunk couldn't be saved, none of its lists were created."))
+        chunks.append(ImportChunkResult(chunk=len(chunks) + 1, first_line=first_line, last_line=line_number,
+                                        lists_created=lists_created, items_created=items_created, errors=errors))
+        logger.info(f"Import chunk {len(chunks)} of user {user_id}: lines {first_line}-{line_number}, "
+                    f"{lists_created} lists and {items_created} items created, {len(errors)} errors")
+        pending, pending_items, errors, first_line = [], 0, [], line_number + 1
+
+    async for line in read_lines(request):
+        line_number += 1
+        if line is None:
+            errors.append(ImportLineError(line=line_number, error=f"The line exceeds {MAX_LINE_BYTES} bytes, the rest of the body wasn't read."))
+            break
+        if line.strip():
+            try:
+                list_create = ListCreate.model_validate_json(line)
+                pending.append(list_create)
+                pending_items += len(list_create.list_items or [])
+            except ValidationError as e:
+                errors.append(ImportLineError(line=line_number, error="; ".join(
+                    f"{'.'.join(str(part) for part in error['loc']) or 'line'}: {error['msg']}" for error in e.errors()
+                )))
+        # Lists can have any number of items, so chunks are also capped by items to bound the size of a transaction
+        if len(pending) >= settings.IMPORT_CHUNK_SIZE or pending_items >= settings.IMPORT_CHUNK_MAX_ITEMS:
+            await write_chunk()
+    if pending or errors:
+        await write_chunk()
+
+    result = ImportResult(
+        lines_read=line_number,
+        lists_created=sum(chunk.lists_created for chunk in chunks),
+        items_created=sum(chunk.items_created for chunk in chunks),
+        chunks=chunks
+    )
+    message = "Lists imported successfully" if not any(chunk.errors for chunk in chunks) else "Lists imported with errors"
+    return FastJSONResponse(ResponseWithData(message=message, data=result))
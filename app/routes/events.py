@@ -0,0 +1,72 @@
+# Imports from external libraries
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+import orjson
+
+# Imports from app modules
+from app.models.user import User
+from app.utils import get_current_user
+from app.events import broker
+from app.config import settings
+
+# Imports from standard library
+from typing import AsyncIterator
+import asyncio
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+
+async def stream_events(user_id: int) -> AsyncIterator[bytes]:
+    """
+    Yields the user's change events in the Server-Sent Events format, with a comment as heartbeat when there are none.
+    A stream that falls too far behind gets a "resync" event and is closed.
+    The subscription is only taken once the stream starts, so it's always released by the generator,
+    even if the response is never sent.
+    """
+    subscription = broker.subscribe(user_id)
+    if subscription is None:
+        # Other streams of the user were opened since the request was accepted
+        return
+    try:
+        # Browsers reconnect after this many milliseconds when the stream ends
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": heartbeat\n\n"
+                continue
+            yield b"event: " + event["type"].encode() + b"\ndata: " + orjson.dumps(event) + b"\n\n"
+            if subscription.overflowed and subscription.queue.empty():
+                yield b"event: resync\ndata: {}\n\n"
+                return
+    finally:
+        broker.unsubscribe(user_id, subscription)
+
+
+@router.get("",
+            summary="Stream changes of lists and list items",
+            description=f"""
+Streams the changes of the authenticated user's lists and list items as Server-Sent Events, instead of polling for them.
+
+- **Authorization**: Requires a valid JWT token in the *Authorization* header.
+
+Every event has a type (*list.created*, *list.updated*, *list.deleted*, *lists.imported*, *list_item.created*,
+*list_item.updated* or *list_item.deleted*) and JSON data with the *list_id*, the *ids* of the changed items
+(or imported lists; null when there are too many) and the time of the change. A comment is sent as heartbeat
+every {settings.EVENTS_HEARTBEAT_SECONDS:g} seconds without events.
+
+A client that doesn't read its events fast enough gets a *resync* event and the stream is closed; it should reconnect
+and reload its data. At most {settings.EVENTS_MAX_STREAMS_PER_USER} streams can be open per user and worker.
+""",
+            response_class=StreamingResponse)
+async def get_events(current_user: User = Depends(get_current_user)):
+    user_id: int = current_user.id #type: ignore
+    if not broker.can_subscribe(user_id):
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Too many open event streams.")
+    return StreamingResponse(
+        stream_events(user_id),
+        media_type="text/event-stream",
+        # Keeps proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
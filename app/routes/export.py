@@ -0,0 +1,68 @@
+# Imports from external libraries
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+import orjson
+
+# Imports from app modules
+import app.crud.list_crud as list_crud
+from app.models.user import User
+from app.db import create_session
+from app.utils import get_current_user
+from app.config import settings
+
+# Imports from standard library
+from typing import AsyncIterator
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+
+async def generate_export(user_id: int) -> AsyncIterator[bytes]:
+    """
+    Yields the NDJSON lines of a user's export, one chunk per batch of rows.
+    The request's session is closed before the response is streamed, so the export uses its own session.
+    """
+    async with create_session() as session:
+        current_list_id = None
+        async for rows in list_crud.stream_user_lists_with_items(session, user_id, settings.EXPORT_BATCH_SIZE):
+            lines = []
+            for row in rows:
+                if row.id != current_list_id:
+                    current_list_id = row.id
+                    lines.append(orjson.dumps({
+                        "type": "list",
+                        "id": row.id,
+                        "name": row.name,
+                        "created_at": row.created_at,
+                        "last_modified_at": row.last_modified_at
+                    }))
+                if row.item_id is not None:
+                    lines.append(orjson.dumps({
+                        "type": "list_item",
+                        "id": row.item_id,
+                        "list_id": row.id,
+                        "content": row.content,
+                        "is_completed": row.is_completed,
+                        "created_at": row.item_created_at,
+                        "last_modified_at": row.item_last_modified_at
+                    }))
+            yield b"\n".join(lines) + b"\n"
+
+
+@router.get("",
+            summary="Export all lists and list items",
+            description="""
+Streams all to-do lists of the authenticated user together with their items as NDJSON (one JSON object per line).
+
+- **Authorization**: Requires a valid JWT token in the *Authorization* header.
+
+Each list is written as a line with *"type": "list"*, followed by one line with *"type": "list_item"* per item of the list.
+The export is streamed while it is read from the database, so it can be consumed line by line.
+""",
+            response_class=StreamingResponse,
+            responses={200: {"content": {"application/x-ndjson": {}}}})
+async def export_lists(current_user: User = Depends(get_current_user)):
+    return StreamingResponse(
+        generate_export(current_user.id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="export.ndjson"'}
+    )
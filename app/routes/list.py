@@ -1,15 +1,19 @@
 # Imports from external libraries
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Query, Body, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # Imports from app modules
 from app.schemas.list import *
 from app.schemas.base import *
+from app.responses import FastJSONResponse
 import app.crud.list_crud as list_crud
-import app.crud.list_item_crud as list_items_crud
 from app.models.user import User
 from app.db import get_session
 from app.utils import get_current_user
+from app.pagination import encode_cursor, decode_cursor
+from app.exceptions import InvalidCursorException
+from app.etag import make_etag, is_not_modified, cache_headers, not_modified_response
+import app.response_cache as response_cache
 
 # Imports fomr standard library
 import math
@@ -42,12 +46,9 @@ async def create_list(
     current_user: User = Depends(get_current_user)
 ):
     new_list = await list_crud.create_list(session, list, current_user.id)
-    if list.list_items:
-        await list_items_crud.create_list_items(session, list.list_items, new_list)
-        await session.refresh(new_list)
-    return ResponseWithData(message="List created successfully", data={
+    return FastJSONResponse(ResponseWithData(message="List created successfully", data={
         "list": ListPublic.model_validate(new_list)
-    })
+    }))
 
 @router.get("", 
             summary="Retrieve user lists",
@@ -61,31 +62,50 @@ Retrieves all to-do lists belonging to the authenticated user with optional filt
   - *sort_order* [optional]: The order of sorting. Available options: asc or desc.
   - *page*: The page number to retrieve (default is 1).
   - *page_size*: The number of lists per page (default is 10).
+  - *after* [optional]: The *next_cursor* of the previous page. When provided, *page* is ignored and the next page is located by seeking, which stays fast for deep pages.
+  - *include_total* [optional]: Whether to count *total_items* and *total_pages* (default is true). Set to false to skip counting, e.g. for infinite scrolling.
 
-Returns a paginated list of to-do lists.
+Returns a paginated list of to-do lists, with a *next_cursor* if there are more lists.
+Supports conditional requests: send the *ETag* of a previous response in *If-None-Match* to get *304 Not Modified* when nothing changed.
 """,
             response_model=ResponseWithPagination[ListsPagination])
 async def get_lists(
+    request: Request,
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
     name: str | None = Query(None, description="Optional filter by list name."),
     sort_by: SortBy | None = Query(None, description="Field to sort by: name or created_at."),
     sort_order: SortOrder | None = Query(None, description="Sort order: asc or desc."),
     page: int = Query(1, ge=1, description="The page number to retrieve."),
-    page_size: int = Query(10, ge=1, description="The number of lists per page.")
-):        
-    lists, total_items = await list_crud.get_user_lists(session, current_user.id, name, sort_by, sort_order, page, page_size)
-    message = "Lists retrieved successfully" if len(lists) > 0 else "No lists were found with such parameters."
+    page_size: int = Query(10, ge=1, description="The number of lists per page."),
+    after: str | None = Query(None, description="Cursor returned as next_cursor by the previous page."),
+    include_total: bool = Query(True, description="Whether to count the total number of lists.")
+):
+    async def build_response() -> Response:
+        sort_spec = f"{sort_by.value if sort_by else 'id'}:{sort_order.value if sort_order else 'asc'}"
+        try:
+            after_key = decode_cursor(after, sort_spec) if after else None
+        except InvalidCursorException as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        last_modified_at, lists_count = await list_crud.get_user_lists_version(session, current_user.id, name)
+        etag = make_etag("lists", current_user.id, last_modified_at, lists_count, request.url.query)
+        if is_not_modified(request, etag, last_modified_at):
+            return not_modified_response(etag, last_modified_at)
+        lists, total_items, next_key = await list_crud.get_user_lists(session, current_user.id, name, sort_by, sort_order, page, page_size, after_key, include_total)
+        message = "Lists retrieved successfully" if len(lists) > 0 else "No lists were found with such parameters."
     
-    lists_public = [ListPublic.model_validate(lst) for lst in lists]
+        lists_public = validate_many(ListPublic, lists)
+
+        return FastJSONResponse(ResponseWithPagination(message=message, data={
+            "lists": lists_public,
+            "total_items": total_items,
+            "total_pages": math.ceil(total_items / page_size) if total_items is not None else None,
+            "page": page,
+            "page_size": page_size,
+            "next_cursor": encode_cursor(sort_spec, next_key) if next_key else None
+        }), headers=cache_headers(etag, last_modified_at))
 
-    return ResponseWithPagination(message=message, data={
-        "lists": lists_public,
-        "total_items": total_items,
-        "total_pages": math.ceil(total_items / page_size) if page_size > 0 else 0,
-        "page": page,
-        "page_size": page_size
-    })
+    return await response_cache.cached_response(request, current_user.id, build_response)
 
 @router.get("/{list_id}", 
             summary="Retrieve a specific to-do list",
@@ -97,19 +117,27 @@ Retrieves the details of a specific to-do list identified by its ID.
   - *list_id*: The ID of the to-do list.
 
 Returns the to-do list details.
+Supports conditional requests: send the *ETag* of a previous response in *If-None-Match* to get *304 Not Modified* when nothing changed.
 """,
             response_model=ResponseWithData[SpecificList])
 async def get_list_by_Id(
     list_id: int,
+    request: Request,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    found_list = await list_crud.get_user_list_by_id(session, current_user.id, list_id)
-    if not found_list:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="The list with such an id wasn't found within user lists.")
-    return ResponseWithData(message="List retrieved successfully", data={
-        "list": ListPublic.model_validate(found_list)
-    })
+    async def build_response() -> Response:
+        found_list = await list_crud.get_user_list_by_id(session, current_user.id, list_id)
+        if not found_list:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="The list with such an id wasn't found within user lists.")
+        etag = make_etag("list", found_list.id, found_list.last_modified_at)
+        if is_not_modified(request, etag, found_list.last_modified_at):
+            return not_modified_response(etag, found_list.last_modified_at)
+        return FastJSONResponse(ResponseWithData(message="List retrieved successfully", data={
+            "list": ListPublic.model_validate(found_list)
+        }), headers=cache_headers(etag, found_list.last_modified_at))
+
+    return await response_cache.cached_response(request, current_user.id, build_response)
 
 @router.patch("/{list_id}", 
               summary="Update a to-do list",
@@ -141,9 +169,9 @@ async def update_list(
     if not found_list:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="The list with such an id wasn't found within user lists.")
     updated_list = await list_crud.update_list(session, found_list, list)
-    return ResponseWithData(message="List updated successfully", data={
+    return FastJSONResponse(ResponseWithData(message="List updated successfully", data={
         "list": ListPublic.model_validate(updated_list)
-    })
+    }))
 
 @router.delete("/{list_id}", 
                summary="Delete a to-do list",
@@ -166,4 +194,4 @@ async def delete_list(
     if not found_list:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="The list with such an id wasn't found within user lists.")
     await list_crud.delete_list(session, found_list)
-    return ResponseWithNoData(message="List deleted successfully")
\ No newline at end of file
+    return FastJSONResponse(ResponseWithNoData(message="List deleted successfully"))
\ No newline at end of file
@@ -1,19 +1,28 @@
 # Imports from external libraries
-from fastapi import APIRouter, Depends, HTTPException, status, Body, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Body, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # Imports from app modules
 from app.schemas.list_item import *
 from app.schemas.base import *
+from app.responses import FastJSONResponse
 import app.crud.list_crud as list_crud
 import app.crud.list_item_crud as list_item_crud
 from app.models.user import User
 from app.db import get_session
 from app.utils import get_current_user
+from app.config import settings
+from app.pagination import encode_cursor, decode_cursor
+from app.exceptions import InvalidCursorException
+from app.etag import make_etag, is_not_modified, cache_headers, not_modified_response
+import app.response_cache as response_cache
 
 # Imports from standard library
 import math
 
+# CONSTANTS
+ITEMS_SORT_SPEC = "created_at:asc"
+
 router = APIRouter(prefix="/lists/{list_id}/items", tags=["List Items"])
 
 
@@ -40,12 +49,11 @@ async def create_list_item(
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    found_list = await list_crud.get_user_list_by_id(session, current_user.id, list_id)
-    if not found_list:
+    created_items = await list_item_crud.create_list_items(session, list_items, list_id, current_user.id) #type: ignore
+    if created_items is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No list with such an id was found within user lists")
-    created_items = await list_item_crud.create_list_items(session, list_items, found_list)
-    public_items = [ListItemPublic.model_validate(item) for item in created_items]
-    return ResponseWithData(message="List items created successfully", data={"list_items": public_items})
+    public_items = validate_many(ListItemPublic, created_items)
+    return FastJSONResponse(ResponseWithData(message="List items created successfully", data={"list_items": public_items}))
 
 
 @router.get("", 
@@ -58,30 +66,95 @@ Retrieves list items for the specified list with pagination support.
   - *list_id* [path]: The ID of the list.
   - *page* [query]: The page number to retrieve (default is 1).
   - *page_size* [query]: The number of items per page (default is 10).
+  - *after* [query, optional]: The *next_cursor* of the previous page. When provided, *page* is ignored and the next page is located by seeking, which stays fast for deep pages.
+  - *include_total* [query, optional]: Whether to count *total_items* and *total_pages* (default is true). Set to false to skip counting, e.g. for infinite scrolling.
 
-Returns the list items along with pagination details.
+Returns the list items along with pagination details, with a *next_cursor* if there are more items.
+Supports conditional requests: send the *ETag* of a previous response in *If-None-Match* to get *304 Not Modified* when nothing changed.
 """,
             response_model=ResponseWithPagination[ListsItemsPagination])
 async def get_list_items(
     list_id: int,
+    request: Request,
     page: int = Query(1, ge=1, description="The page number to retrieve."),
     page_size: int = Query(10, ge=1, description="Number of items per page."),
+    after: str | None = Query(None, description="Cursor returned as next_cursor by the previous page."),
+    include_total: bool = Query(True, description="Whether to count the total number of items."),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    async def build_response() -> Response:
+        try:
+            after_key = decode_cursor(after, ITEMS_SORT_SPEC) if after else None
+        except InvalidCursorException as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        # The list is read together with the page, which checks that it belongs to the user in the same query
+        found_list, list_items, total_items, next_key = await list_item_crud.get_list_items(session, list_id, current_user.id, page, page_size, after_key, include_total) #type: ignore
+        if not found_list:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No list with such an id was found within user lists")
+        # Every change to the list's items also bumps the list's last_modified_at
+        etag = make_etag("list_items", found_list.id, found_list.last_modified_at, request.url.query)
+        if is_not_modified(request, etag, found_list.last_modified_at):
+            return not_modified_response(etag, found_list.last_modified_at)
+        message = "List items retrieved successfully" if list_items else "No list items were found within the specified list."
+        list_items_public = validate_many(ListItemPublic, list_items)
+        return FastJSONResponse(ResponseWithPagination(message=message, data={
+            "list_items": list_items_public,
+            "total_items": total_items,
+            "total_pages": math.ceil(total_items / page_size) if total_items is not None else None,
+            "page": page,
+            "page_size": page_size,
+            "next_cursor": encode_cursor(ITEMS_SORT_SPEC, next_key) if next_key else None
+        }), headers=cache_headers(etag, found_list.last_modified_at))
+
+    return await response_cache.cached_response(request, current_user.id, build_response)
+
+
+@router.patch("", 
+              summary="Update and delete list items in bulk",
+              description="""
+Applies the same changes to many list items and deletes many list items of the specified list in one request.
+
+- **Authorization**: Requires a valid JWT token in the *Authorization* header.
+- **Parameters**:
+  - *list_id* [path]: The ID of the list.
+  - *update* [body, optional]: The *ids* of the items to update and the *changes* to apply to all of them (supports partial updates).
+  - *delete* [body, optional]: The ids of the items to delete.
+
+Ids that don't belong to the list are reported in *not_found_ids*. An item that is both updated and deleted ends up deleted.
+
+Returns the updated items and the ids of the deleted items.
+""",
+              response_model=ResponseWithData[ListItemsBatchResult])
+async def update_list_items(
+    list_id: int,
+    batch: ListItemsBatch = Body(
+        ...,
+        description="The items to update and to delete.",
+        example={
+            "update": {"ids": [1, 2, 3], "changes": {"is_completed": True}},
+            "delete": [4, 5]
+        }
+    ),
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
+    requested_ids = set(batch.update.ids if batch.update else []) | set(batch.delete or [])
+    if len(requested_ids) > settings.LIST_ITEMS_BATCH_MAX_IDS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"A batch can affect at most {settings.LIST_ITEMS_BATCH_MAX_IDS} list items.")
     found_list = await list_crud.get_user_list_by_id(session, current_user.id, list_id)
     if not found_list:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No list with such an id was found within user lists")
-    list_items, total_items = await list_item_crud.get_list_items(session, list_id, current_user.id, page, page_size)
-    message = "List items retrieved successfully" if list_items else "No list items were found within the specified list."
-    list_items_public = [ListItemPublic.model_validate(item) for item in list_items or []]
-    return ResponseWithPagination(message=message, data={
-        "list_items": list_items_public,
-        "total_items": total_items,
-        "total_pages": math.ceil(total_items / page_size) if page_size > 0 else 0,
-        "page": page,
-        "page_size": page_size
-    })
+    updated_items, deleted_ids = await list_item_crud.apply_list_items_batch(session, found_list, batch)
+    found_ids = {item.id for item in updated_items} | set(deleted_ids)
+    if batch.update and not batch.update.changes.model_dump(exclude_unset=True):
+        # Nothing to change, so the items to update weren't looked up
+        found_ids |= set(batch.update.ids)
+    return FastJSONResponse(ResponseWithData(message="List items updated successfully", data=ListItemsBatchResult(
+        updated_items=validate_many(ListItemPublic, updated_items),
+        deleted_ids=deleted_ids,
+        not_found_ids=sorted(requested_ids - found_ids)
+    )))
 
 
 @router.get("/{list_item_id}", 
@@ -106,7 +179,7 @@ async def get_list_item(
     list_item = await list_item_crud.get_list_item_by_id(session, list_item_id, list_id, current_user.id)
     if not list_item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Couldn't find the specified list item.")
-    return ResponseWithData(message="List item retrieved successfully", data={"list_item": ListItemPublic.model_validate(list_item)})
+    return FastJSONResponse(ResponseWithData(message="List item retrieved successfully", data={"list_item": ListItemPublic.model_validate(list_item)}))
 
 
 @router.patch("/{list_item_id}", 
@@ -137,11 +210,11 @@ async def update_list_item(
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    found_list_item = await list_item_crud.get_list_item_by_id(session, list_item_id, list_id, current_user.id)
+    found_list_item = await list_item_crud.get_list_item_by_id(session, list_item_id, list_id, current_user.id, with_list=True)
     if found_list_item is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Couldn't find the specified list item in the specified list.")
     updated_list_item = await list_item_crud.update_list_item(session, found_list_item, found_list_item.list, list_item)
-    return ResponseWithData(message="List item updated successfully", data={"list_item": ListItemPublic.model_validate(updated_list_item)})
+    return FastJSONResponse(ResponseWithData(message="List item updated successfully", data={"list_item": ListItemPublic.model_validate(updated_list_item)}))
 
 
 @router.delete("/{list_item_id}", 
@@ -163,8 +236,8 @@ async def delete_list_item(
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    found_list_item = await list_item_crud.get_list_item_by_id(session, list_item_id, list_id, current_user.id)
+    found_list_item = await list_item_crud.get_list_item_by_id(session, list_item_id, list_id, current_user.id, with_list=True)
     if found_list_item is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Couldn't find the specified list item in the specified list.")
     await list_item_crud.delete_list_item(session, found_list_item)
-    return ResponseWithNoData(message="List item deleted successfully")
\ No newline at end of file
+    return FastJSONResponse(ResponseWithNoData(message="List item deleted successfully"))
\ No newline at end of file
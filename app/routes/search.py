@@ -0,0 +1,87 @@
+# Imports from external libraries
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Imports from app modules
+from app.schemas.list import ListsSearchPagination, ListPublic
+from app.schemas.list_item import ListItemsSearchPagination, ListItemSearchResult
+from app.schemas.base import *
+from app.responses import FastJSONResponse
+import app.crud.list_crud as list_crud
+import app.crud.list_item_crud as list_item_crud
+from app.models.user import User
+from app.db import get_session
+from app.utils import get_current_user
+
+# Imports from standard library
+import math
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("/lists",
+            summary="Search lists by name",
+            description="""
+Searches the authenticated user's to-do lists whose name contains the search term, ignoring case.
+
+- **Authorization**: Requires a valid JWT token in the *Authorization* header.
+- **Query Parameters**:
+  - *q*: The search term.
+  - *page*: The page number to retrieve (default is 1).
+  - *page_size*: The number of lists per page (default is 10).
+  - *include_total* [optional]: Whether to count *total_items* and *total_pages* (default is true).
+
+Returns the matching lists, most relevant first. Terms of at least 3 characters are looked up in a search index.
+""",
+            response_model=ResponseWithPagination[ListsSearchPagination])
+async def search_lists(
+    q: str = Query(..., min_length=1, description="The search term."),
+    page: int = Query(1, ge=1, description="The page number to retrieve."),
+    page_size: int = Query(10, ge=1, description="The number of lists per page."),
+    include_total: bool = Query(True, description="Whether to count the total number of matching lists."),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    lists, total_items = await list_crud.search_user_lists(session, current_user.id, q, page, page_size, include_total)
+    message = "Lists retrieved successfully" if lists else "No lists were found with such parameters."
+    return FastJSONResponse(ResponseWithPagination(message=message, data={
+        "lists": validate_many(ListPublic, lists),
+        "total_items": total_items,
+        "total_pages": math.ceil(total_items / page_size) if total_items is not None else None,
+        "page": page,
+        "page_size": page_size
+    }))
+
+
+@router.get("/items",
+            summary="Search list items by content",
+            description="""
+Searches the items of all the authenticated user's lists whose content contains the search term, ignoring case.
+
+- **Authorization**: Requires a valid JWT token in the *Authorization* header.
+- **Query Parameters**:
+  - *q*: The search term.
+  - *page*: The page number to retrieve (default is 1).
+  - *page_size*: The number of items per page (default is 10).
+  - *include_total* [optional]: Whether to count *total_items* and *total_pages* (default is true).
+
+Returns the matching list items with the id of their list, most relevant first. Terms of at least 3 characters are looked up in a search index.
+""",
+            response_model=ResponseWithPagination[ListItemsSearchPagination])
+async def search_list_items(
+    q: str = Query(..., min_length=1, description="The search term."),
+    page: int = Query(1, ge=1, description="The page number to retrieve."),
+    page_size: int = Query(10, ge=1, description="The number of items per page."),
+    include_total: bool = Query(True, description="Whether to count the total number of matching items."),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    list_items, total_items = await list_item_crud.search_user_list_items(session, current_user.id, q, page, page_size, include_total)
+    message = "List items retrieved successfully" if list_items else "No list items were found with such parameters."
+    return FastJSONResponse(ResponseWithPagination(message=message, data={
+        "list_items": validate_many(ListItemSearchResult, list_items),
+        "total_items": total_items,
+        "total_pages": math.ceil(total_items / page_size) if total_items is not None else None,
+        "page": page,
+        "page_size": page_size
+    }))
@@ -0,0 +1,64 @@
+# Imports from external libraries
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Imports from app modules
+from app.schemas.sync import SyncChanges
+from app.schemas.list import ListPublic
+from app.schemas.list_item import ListItemSearchResult
+from app.models.tombstone import TombstonePublic
+from app.schemas.base import *
+from app.responses import FastJSONResponse
+from app.models.user import User
+from app.db import get_session
+from app.utils import get_current_user
+from app.pagination import encode_sync_token, decode_sync_token
+from app.exceptions import InvalidCursorException, SyncTokenExpiredException
+from app.config import settings
+import app.crud.sync_crud as sync_crud
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+
+@router.get("",
+            summary="Retrieve the changes since the last sync",
+            description=f"""
+Retrieves the authenticated user's lists and list items created or modified since the given sync token,
+and the lists and list items deleted since then, so a client can keep a local copy up to date.
+
+- **Authorization**: Requires a valid JWT token in the *Authorization* header.
+- **Query Parameters**:
+  - *since* [optional]: The *next_token* of the previous sync. Without it, all lists and list items are returned.
+  - *page_size*: The maximum number of changes (lists, list items and deletions together) to return (default is 500).
+
+Returns the changed lists, the changed list items with the id of their list and the deletions (*entity* is *list*
+or *list_item*; a deleted list's items are deleted with it), oldest change first, together with the *next_token*
+to pass as *since* in the next sync. Clients should apply the deletions before the changed lists and items.
+While *has_more* is true there are more changes, which the next sync returns straight away.
+
+Changes of the last {settings.SYNC_SETTLE_SECONDS:g} seconds are returned by the next sync. Deletions are kept for
+{settings.SYNC_TOMBSTONE_RETENTION_DAYS:g} days: an older token gets 410 and the client should sync from scratch.
+""",
+            response_model=ResponseWithData[SyncChanges])
+async def get_changes(
+    since: str | None = Query(None, description="The sync token of the previous sync."),
+    page_size: int = Query(500, ge=1, le=1000, description="The maximum number of changes to return."),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    try:
+        positions = decode_sync_token(since, sync_crud.SYNC_STREAMS) if since else None
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    try:
+        lists, list_items, tombstones, next_positions, has_more = await sync_crud.get_changes(session, current_user.id, positions, page_size) #type: ignore
+    except SyncTokenExpiredException as e:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=str(e))
+    message = "Changes retrieved successfully" if lists or list_items or tombstones else "No changes since the last sync."
+    return FastJSONResponse(ResponseWithData(message=message, data={
+        "lists": validate_many(ListPublic, lists),
+        "list_items": validate_many(ListItemSearchResult, list_items),
+        "deleted": validate_many(TombstonePublic, tombstones),
+        "next_token": encode_sync_token(next_positions),
+        "has_more": has_more
+    }))
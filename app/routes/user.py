@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 # Imports from app modules
 from app.schemas.user import *
 from app.schemas.base import *
+from app.responses import FastJSONResponse
 import app.crud.user_crud as user_crud
 from app.models.user import User
 from app.exceptions import UserNotFoundException, InvalidCredentialsException
@@ -51,9 +52,9 @@ async def create_user(
             detail="The password you provided is weak. It should contain at least 1 lowercase letter, 1 uppercase letter, 1 digit and 1 special character."
         )
     created_user = await user_crud.create_user(session, db_user)
-    return ResponseWithData(message="User created successfully", data={
+    return FastJSONResponse(ResponseWithData(message="User created successfully", data={
         "user": UserPublic.model_validate(created_user)
-    })
+    }))
 
 
 @router.post("/login",
@@ -82,11 +83,11 @@ async def login(
     except InvalidCredentialsException as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     access_token, refresh_token = generate_access_and_refresh_tokens(authenticated_user.id)
-    return ResponseWithData(message="Login successful", data={
+    return FastJSONResponse(ResponseWithData(message="Login successful", data={
         "access_token": access_token,
         "token_type": "Bearer",
         "refresh_token": refresh_token
-    })
+    }))
 
 
 @router.get("/me",
@@ -100,9 +101,9 @@ Returns the user's profile information.
 """,
             response_model=ResponseWithData[UserInfo])
 def get_me(current_user: User = Depends(get_current_user)):
-    return ResponseWithData(message="User retrieved successfully", data={
+    return FastJSONResponse(ResponseWithData(message="User retrieved successfully", data={
         "user": UserPublic.model_validate(current_user)
-    })
+    }))
 
 
 @router.patch("/users",
@@ -137,9 +138,9 @@ async def update_user(
             detail="The password you provided is weak. It should contain at least 1 lowercase letter, 1 uppercase letter, 1 digit and 1 special character."
         )
     updated_user = await user_crud.update_user(session, current_user, user)
-    return ResponseWithData(message="User updated successfully", data={
+    return FastJSONResponse(ResponseWithData(message="User updated successfully", data={
         "user": UserPublic.model_validate(updated_user)
-    })
+    }))
 
 
 @router.delete("/users",
@@ -157,7 +158,7 @@ async def delete_user(
     current_user: User = Depends(get_current_user)
 ):
     await user_crud.delete_user(session, current_user)
-    return ResponseWithNoData(message="User deleted successfully")
+    return FastJSONResponse(ResponseWithNoData(message="User deleted successfully"))
 
 
 @router.post("/refresh-token",
@@ -175,8 +176,8 @@ def refresh_token(
     current_user: User = Depends(validate_refresh_token)
 ):
     access_token, new_refresh_token = generate_access_and_refresh_tokens(current_user.id)
-    return ResponseWithData(message="Token refreshed successfully", data={
+    return FastJSONResponse(ResponseWithData(message="Token refreshed successfully", data={
         "access_token": access_token,
         "token_type": "Bearer",
         "refresh_token": new_refresh_token
-    })
+    }))
@@ -1,10 +1,12 @@
 # Imports from external library
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 # Imports from standard library
-from typing import Generic, TypeVar
+from functools import cache
+from typing import Any, Generic, Iterable, TypeVar
 
 DataT = TypeVar("DataT")
+ModelT = TypeVar("ModelT", bound=BaseModel)
 
 class ResponseBase(BaseModel):
     message: str
@@ -16,4 +18,15 @@ class ResponseWithData(ResponseBase, Generic[DataT]):
     data: DataT
 
 class ResponseWithPagination(ResponseBase, Generic[DataT]):
-    data: DataT
\ No newline at end of file
+    data: DataT
+
+
+@cache
+def _list_adapter(model: type[BaseModel]) -> TypeAdapter[Any]:
+    return TypeAdapter(list[model])  # type: ignore
+
+def validate_many(model: type[ModelT], rows: Iterable[Any]) -> list[ModelT]:
+    """
+    Validates rows (e.g. ORM objects) into public models with a single pydantic-core call.
+    """
+    return _list_adapter(model).validate_python(list(rows), from_attributes=True)
@@ -0,0 +1,23 @@
+# Imports from external libraries
+from pydantic import BaseModel
+
+# Imports from standard library
+from typing import Any, Literal
+
+class BatchOperation(BaseModel):
+    method: Literal["GET", "POST", "PATCH", "DELETE"]
+    path: str
+    query: dict[str, Any] | None = None
+    body: Any = None
+
+class BatchRequest(BaseModel):
+    operations: list[BatchOperation]
+    atomic: bool = False
+
+class BatchOperationResult(BaseModel):
+    status: int
+    body: Any = None
+
+class BatchResult(BaseModel):
+    results: list[BatchOperationResult]
+    committed: bool
@@ -14,8 +14,16 @@ class ListUpdate(SQLModel):
 
 class ListsPagination(BaseModel):
     lists: list[ListPublic]
-    total_items: int
-    total_pages: int
+    total_items: int | None = None
+    total_pages: int | None = None
+    page: int
+    page_size: int
+    next_cursor: str | None = None
+
+class ListsSearchPagination(BaseModel):
+    lists: list[ListPublic]
+    total_items: int | None = None
+    total_pages: int | None = None
     page: int
     page_size: int
 
@@ -24,3 +32,21 @@ class Lists(BaseModel):
 
 class SpecificList(BaseModel):
     list: ListPublic
+
+class ImportLineError(BaseModel):
+    line: int | None
+    error: str
+
+class ImportChunkResult(BaseModel):
+    chunk: int
+    first_line: int
+    last_line: int
+    lists_created: int
+    items_created: int
+    errors: list[ImportLineError]
+
+class ImportResult(BaseModel):
+    lines_read: int
+    lists_created: int
+    items_created: int
+    chunks: list[ImportChunkResult]
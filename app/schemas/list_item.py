@@ -1,5 +1,5 @@
 # Imports from external libraries
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 
 # IMports from app modules
 from app.models.list_item import *
@@ -8,10 +8,43 @@ class ListItemUpdate(SQLModel):
     content: str | None = None
     is_completed: bool | None = None
 
+class ListItemsBatchUpdate(SQLModel):
+    ids: list[int]
+    changes: ListItemUpdate
+
+    @field_validator("changes")
+    @classmethod
+    def changes_not_null(cls, changes: ListItemUpdate) -> ListItemUpdate:
+        # The changes are written as they are in one UPDATE, and the columns can't be null
+        null_fields = [field for field, value in changes.model_dump(exclude_unset=True).items() if value is None]
+        if null_fields:
+            raise ValueError(f"Changes can't set {', '.join(null_fields)} to null.")
+        return changes
+
+class ListItemsBatch(SQLModel):
+    update: ListItemsBatchUpdate | None = None
+    delete: list[int] | None = None
+
+class ListItemsBatchResult(BaseModel):
+    updated_items: list[ListItemPublic]
+    deleted_ids: list[int]
+    not_found_ids: list[int]
+
 class ListsItemsPagination(BaseModel):
     list_items: list[ListItemPublic]
-    total_items: int
-    total_pages: int
+    total_items: int | None = None
+    total_pages: int | None = None
+    page: int
+    page_size: int
+    next_cursor: str | None = None
+
+class ListItemSearchResult(ListItemPublic):
+    list_id: int
+
+class ListItemsSearchPagination(BaseModel):
+    list_items: list[ListItemSearchResult]
+    total_items: int | None = None
+    total_pages: int | None = None
     page: int
     page_size: int
 
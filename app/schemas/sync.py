@@ -0,0 +1,14 @@
+# Imports from external libraries
+from pydantic import BaseModel
+
+# Imports from app modules
+from app.models.list import ListPublic
+from app.models.tombstone import TombstonePublic
+from app.schemas.list_item import ListItemSearchResult
+
+class SyncChanges(BaseModel):
+    lists: list[ListPublic]
+    list_items: list[ListItemSearchResult]
+    deleted: list[TombstonePublic]
+    next_token: str
+    has_more: bool
@@ -0,0 +1,147 @@
+# Imports from external libraries
+from sqlalchemy import func, select, literal_column, table, column, ColumnElement, Select
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+
+# Imports from standard library
+from typing import Any
+import logging
+
+# Trigrams need at least three characters; shorter terms fall back to a pattern scan
+MIN_INDEXED_TERM_LENGTH = 3
+
+# Searchable text columns: (table, column)
+SEARCHABLE_COLUMNS = [("list", "name"), ("listitem", "content")]
+
+# The owner of a row of each searchable table, from the row itself or from its list ("{row}" is the row's alias)
+FTS_OWNERS = {"list": "{row}.user_id", "listitem": "(SELECT user_id FROM list WHERE list.id = {row}.list_id)"}
+
+logger = logging.getLogger(__name__)
+
+# Whether the SQLite full-text tables were created, set on startup by "create_search_indexes"
+fts_enabled = False
+
+
+def create_search_indexes(connection: Connection) -> None:
+    """
+    Creates the indexes backing substring search of list names and item contents:
+    trigram GIN indexes on PostgreSQL and trigram FTS5 tables kept in sync by triggers on SQLite.
+    Search falls back to pattern scans when the database doesn't support them.
+    """
+    global fts_enabled
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        try:
+            with connection.begin_nested():
+                connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                for table_name, column_name in SEARCHABLE_COLUMNS:
+                    connection.exec_driver_sql(
+                        f"CREATE INDEX IF NOT EXISTS ix_{table_name}_{column_name}_trgm "
+                        f"ON {table_name} USING gin ({column_name} gin_trgm_ops)"
+                    )
+        except DBAPIError:
+            logger.warning("Couldn't create the pg_trgm search indexes, search will scan instead", exc_info=True)
+    elif dialect == "sqlite":
+        try:
+            with connection.begin_nested():
+                for table_name, column_name in SEARCHABLE_COLUMNS:
+                    create_fts_table(connection, table_name, column_name)
+            fts_enabled = True
+        except DBAPIError:
+            logger.warning("Couldn't create the FTS5 search tables, search will scan instead", exc_info=True)
+
+
+def create_fts_table(connection: Connection, table_name: str, column_name: str) -> None:
+    """
+    Creates an external content FTS5 table indexing the column, with the owner's user_id as an unindexed column
+    so matches can be restricted to the user's rows, the triggers keeping it in sync,
+    and indexes the existing rows when the table is new.
+    The content is read from a view adding the owner to the table's rows. Tables created before the owner
+    was added are created again.
+    """
+    fts = f"{table_name}_fts"
+    owner = FTS_OWNERS[table_name]
+    existing_sql = connection.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)
+    ).scalar()
+    if existing_sql is not None and "user_id" not in existing_sql:
+        connection.exec_driver_sql(f"DROP TABLE {fts}")
+        for trigger in ("ai", "ad", "au"):
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {fts}_{trigger}")
+        existing_sql = None
+    connection.exec_driver_sql(
+        f"CREATE VIEW IF NOT EXISTS {fts}_content AS "
+        f"SELECT id, {column_name}, {owner.format(row=table_name)} AS user_id FROM {table_name}"
+    )
+    connection.exec_driver_sql(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} "
+        f"USING fts5({column_name}, user_id UNINDEXED, content='{fts}_content', content_rowid='id', tokenize='trigram')"
+    )
+    insert_new = f"INSERT INTO {fts}(rowid, {column_name}, user_id) VALUES (new.id, new.{column_name}, {owner.format(row='new')});"
+    delete_old = (
+        f"INSERT INTO {fts}({fts}, rowid, {column_name}, user_id) "
+        f"VALUES ('delete', old.id, old.{column_name}, {owner.format(row='old')});"
+    )
+    connection.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} BEGIN {insert_new} END")
+    connection.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} BEGIN {delete_old} END")
+    connection.exec_driver_sql(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column_name} ON {table_name} BEGIN {delete_old} {insert_new} END"
+    )
+    if existing_sql is None:
+        connection.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def fts_phrase(term: str) -> str:
+    """
+    Quotes the term as an FTS5 phrase, so that it is matched literally.
+    """
+    return '"' + term.replace('"', '""') + '"'
+
+
+def uses_fts(term: str) -> bool:
+    """
+    Whether the term is looked up in the SQLite full-text tables.
+    """
+    return fts_enabled and len(term) >= MIN_INDEXED_TERM_LENGTH
+
+
+def fts_matching_ids(table_name: str, term: str, user_id: int) -> Any:
+    """
+    Selects the ids of the user's rows of the table containing the term, from the table's FTS5 table.
+    """
+    fts = table(f"{table_name}_fts", column("rowid"), column("user_id"))
+    return select(fts.c.rowid).where(literal_column(fts.name).op("MATCH")(fts_phrase(term)), fts.c.user_id == user_id)
+
+
+def contains_condition(id_column: Any, text_column: Any, term: str, user_id: int) -> ColumnElement[bool]:
+    """
+    Builds a case-insensitive substring condition on the column of the user's rows,
+    answered from the search index when there is one.
+    On PostgreSQL the ILIKE pattern itself is served by the trigram index.
+    """
+    if uses_fts(term):
+        return id_column.in_(fts_matching_ids(text_column.table.name, term, user_id))
+    return text_column.ilike(f"%{term}%")
+
+
+def ranked_search(query: Select[Any], dialect: str, id_column: Any, text_column: Any, term: str, user_id: int) -> Select[Any]:
+    """
+    Restricts the query to the rows whose column contains the term and orders them by relevance, best first:
+    trigram word similarity on PostgreSQL, BM25 from SQLite's full-text tables,
+    and shorter texts first (where the term makes up more of the text) otherwise.
+    The query must select the user's rows only; the full-text matches are restricted to them as well,
+    so other users' matches are neither read nor ranked.
+    """
+    if dialect == "postgresql":
+        return query.where(text_column.ilike(f"%{term}%")).order_by(func.word_similarity(term, text_column).desc(), id_column.asc())
+    if uses_fts(term):
+        fts_name = f"{text_column.table.name}_fts"
+        fts = table(fts_name, column("rowid"), column("rank"), column("user_id"))
+        matches = (
+            select(fts.c.rowid, fts.c.rank.label("score"))
+            .where(literal_column(fts_name).op("MATCH")(fts_phrase(term)), fts.c.user_id == user_id)
+            .subquery()
+        )
+        # FTS5's rank is the BM25 score, lower is better
+        return query.join(matches, matches.c.rowid == id_column).order_by(matches.c.score.asc(), id_column.asc())
+    return query.where(text_column.ilike(f"%{term}%")).order_by(func.length(text_column).asc(), id_column.asc())
@@ -3,7 +3,7 @@ from fastapi import Depends, HTTPException, status, Body
 from sqlalchemy.ext.asyncio import AsyncSession
 import jwt
 from jwt.exceptions import InvalidTokenError
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, APIKeyHeader
 
 # Imports from app modules
 import app.crud.user_crud as user_crud
@@ -13,9 +13,14 @@ from app.config import settings
 
 # Imports from standard library
 from datetime import datetime, timedelta, timezone
+from contextvars import ContextVar
 from typing import Any
+import secrets
 
 security = HTTPBearer(auto_error=False)
+admin_key_header = APIKeyHeader(name="X-Admin-Key", auto_error=False)
+# User authenticated by the batch request being processed (see routes/batch.py)
+batch_user: ContextVar[User | None] = ContextVar("batch_user", default=None)
 
 def create_token(data: dict[str, Any], expires_delta: timedelta, token_type: str, secret: str) -> str:
     '''
@@ -40,10 +45,24 @@ def generate_access_and_refresh_tokens(user_id: int) -> tuple[str, str]:
     refresh_token = create_token(token_data, refresh_token_expires, "refresh_token", settings.REFRESH_TOKEN_SECRET) #type:ignore
     return ( access_token, refresh_token)
 
+def decode_access_token_user_id(access_token: str) -> int | None:
+    '''
+    Decodes a JWT access token and returns its "user_id" claim, or None if the token is invalid or expired.
+    '''
+    try:
+        payload = jwt.decode(access_token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]) #type: ignore
+    except InvalidTokenError:
+        return None
+    return payload.get("user_id")
+
 async def get_current_user(auth: HTTPAuthorizationCredentials = Depends(security), session: AsyncSession = Depends(get_session)) -> User:
     '''
-    Decodes the JWT access token and retrieves user from the DB.
+    Decodes the JWT access token and retrieves user's identity from the DB.
+    Operations of a batch request reuse the user the batch was authenticated as.
     '''
+    authenticated_user = batch_user.get()
+    if authenticated_user is not None:
+        return authenticated_user
     creds_ecxeption = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                                     detail={
                                         "error": "invaliid or expired access token."
@@ -57,21 +76,17 @@ async def get_current_user(auth: HTTPAuthorizationCredentials = Depends(security
     if scheme.lower() != "bearer":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail={"error": "Invali authentication scheme."},
                             headers={"WWW-Authenticate": "Bearer"})
-    try:
-        payload = jwt.decode(access_token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]) #type: ignore
-        user_id = payload.get("user_id")
-        if user_id is None:
-            raise creds_ecxeption
-        found_user = await user_crud.get_user_by_id(session, user_id)
-    except InvalidTokenError:
+    user_id = decode_access_token_user_id(access_token)
+    if user_id is None:
         raise creds_ecxeption
+    found_user = await user_crud.get_user_identity(session, user_id)
     if not found_user:
         raise creds_ecxeption
     return found_user
 
 async def validate_refresh_token(refresh_token: str = Body(embed=True, example="YOUR_REFRESH_TOKEN_HERE"), session: AsyncSession = Depends(get_session)) -> User:
     '''
-    Decodes the JWT refresh token and retrieves user from the DB.
+    Decodes the JWT refresh token and retrieves user's identity from the DB.
     '''
     creds_ecxeption = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                                     detail="invaliid or expired refresh token.")
@@ -83,9 +98,19 @@ async def validate_refresh_token(refresh_token: str = Body(embed=True, example="
         user_id = payload.get("user_id")
         if user_id is None:
             raise creds_ecxeption
-        found_user = await user_crud.get_user_by_id(session, user_id)
+        found_user = await user_crud.get_user_identity(session, user_id)
     except InvalidTokenError:
         raise creds_ecxeption
     if not found_user:
         raise creds_ecxeption
-    return found_user
\ No newline at end of file
+    return found_user
+
+def verify_admin_key(admin_key: str | None = Depends(admin_key_header)) -> None:
+    '''
+    Checks the admin API key provided in the "X-Admin-Key" header.
+    Admin endpoints are disabled unless ADMIN_API_KEY is configured.
+    '''
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not admin_key or not secrets.compare_digest(admin_key, settings.ADMIN_API_KEY):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={"error": "Invalid admin key."})
\ No newline at end of file
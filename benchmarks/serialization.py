@@ -0,0 +1,80 @@
+"""
+Compares the previous response path of GET /lists/{list_id}/items with the current one on a page of 1000 list items.
+
+The previous path validated each row with SQLModel.model_validate, then FastAPI re-validated the returned
+model against "response_model" and encoded it with the standard library. The current path validates the
+rows in one pydantic-core call (validate_many) and FastJSONResponse serializes the model directly.
+
+Run from the repository root:
+    python -m benchmarks.serialization
+"""
+# Imports from external libraries
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+# Imports from app modules
+from app.models.list_item import ListItem
+from app.models.list import List  # noqa: F401 (registers the mappers ListItem relates to)
+from app.models.user import User  # noqa: F401
+from app.schemas.list_item import ListItemPublic, ListsItemsPagination
+from app.schemas.base import ResponseWithPagination, validate_many
+from app.responses import FastJSONResponse
+
+# Imports from standard library
+from datetime import datetime
+import asyncio
+import timeit
+
+PAGE_SIZE = 1000
+ROUNDS = 50
+
+
+def build_rows() -> list[ListItem]:
+    now = datetime.now()
+    return [
+        ListItem(id=i, content=f"Item number {i}", created_at=now, last_modified_at=now, is_completed=i % 3 == 0, list_id=1)
+        for i in range(1, PAGE_SIZE + 1)
+    ]
+
+
+def build_response(list_items: list[ListItemPublic]) -> ResponseWithPagination:
+    return ResponseWithPagination(message="List items retrieved successfully", data={
+        "list_items": list_items,
+        "total_items": PAGE_SIZE,
+        "total_pages": 1,
+        "page": 1,
+        "page_size": PAGE_SIZE,
+        "next_cursor": None
+    })
+
+
+def main() -> None:
+    rows = build_rows()
+    response_field = create_model_field(name="Response", type_=ResponseWithPagination[ListsItemsPagination], mode="serialization")
+
+    def default_path() -> bytes:
+        list_items = [ListItemPublic.model_validate(row) for row in rows]
+        content = asyncio.run(serialize_response(field=response_field, response_content=build_response(list_items)))
+        return JSONResponse(content).body
+
+    def fast_path() -> bytes:
+        return FastJSONResponse(build_response(validate_many(ListItemPublic, rows))).body
+
+    def run_in_loop(func):
+        # serialize_response is a coroutine, so both paths pay for an event loop round trip
+        async def wrapped():
+            return func()
+        return lambda: asyncio.run(wrapped())
+
+    assert len(default_path()) > 0 and len(fast_path()) > 0
+    default_seconds = min(timeit.repeat(default_path, number=ROUNDS, repeat=3)) / ROUNDS
+    fast_seconds = min(timeit.repeat(run_in_loop(fast_path), number=ROUNDS, repeat=3)) / ROUNDS
+    print(f"{PAGE_SIZE} items per page, best of 3 x {ROUNDS} rounds")
+    print(f"per-row validation + response_model + JSONResponse: {default_seconds * 1000:8.2f} ms")
+    print(f"validate_many + FastJSONResponse:                   {fast_seconds * 1000:8.2f} ms")
+    print(f"speedup:                                            {default_seconds / fast_seconds:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
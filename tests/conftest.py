@@ -0,0 +1,45 @@
+# Imports from standard library
+import os
+import tempfile
+
+# The app reads its settings and creates its engine on import, so the test environment is set up first
+os.environ.setdefault("DB_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/test.sqlite")
+os.environ.setdefault("JWT_SECRET", "test-jwt-secret-of-at-least-32-bytes")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+os.environ.setdefault("JWT_EXPIRATION_MINUTES", "30")
+os.environ.setdefault("REFRESH_TOKEN_SECRET", "test-refresh-token-secret-of-32-bytes")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRATION_DAYS", "7")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("RESPONSE_CACHE_ENABLED", "false")
+
+# Imports from external libraries
+import httpx
+import pytest
+
+# Imports from app modules
+from app.main import app
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def client():
+    # The lifespan shuts down the password hash pool on exit, so it runs once for the whole session
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+
+
+async def register_and_login(client: httpx.AsyncClient, username: str) -> dict[str, str]:
+    '''
+    Registers a user and returns the authorization header of a fresh access token.
+    '''
+    credentials = {"username": username, "password": "Str0ngPassw0rd!"}
+    response = await client.post("/register", json=credentials)
+    assert response.status_code == 200, response.text
+    response = await client.post("/login", json=credentials)
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['data']['access_token']}"}
@@ -0,0 +1,30 @@
+# Imports from external libraries
+from sqlalchemy import text
+import httpx
+import pytest
+
+# Imports from app modules
+from app.db import db_engine
+from app.response_cache import MemoryBackend
+from app.utils import decode_access_token_user_id
+import app.response_cache as response_cache
+from tests.conftest import register_and_login
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_principal_dropped_by_shared_version_bump(client: httpx.AsyncClient, monkeypatch: pytest.MonkeyPatch):
+    # A backend whose versions stand in for the ones shared by all workers in Redis
+    backend = MemoryBackend(max_size=100, ttl_seconds=60)
+    backend.shared = True
+    monkeypatch.setattr(response_cache, "backend", backend)
+    headers = await register_and_login(client, "auth_cache_shared_user")
+    user_id = decode_access_token_user_id(headers["Authorization"].removeprefix("Bearer "))
+    assert (await client.get("/lists", headers=headers)).status_code == 200
+
+    # Another worker deletes the user: the row is gone and the shared version is bumped, this worker's cache isn't touched
+    async with db_engine.begin() as connection:
+        await connection.execute(text("DELETE FROM user WHERE id = :id"), {"id": user_id})
+    assert (await client.get("/lists", headers=headers)).status_code == 200
+    await backend.bump_version(user_id) #type: ignore
+    assert (await client.get("/lists", headers=headers)).status_code == 401
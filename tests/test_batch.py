@@ -0,0 +1,36 @@
+# Imports from external libraries
+from prometheus_client import REGISTRY
+import httpx
+import pytest
+
+# Imports from app modules
+from app.config import settings
+from app.rate_limit import TokenBucketLimiter
+import app.routes.batch as batch_routes
+from tests.conftest import register_and_login
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_batch_operations_are_rate_limited(client: httpx.AsyncClient, monkeypatch: pytest.MonkeyPatch):
+    headers = await register_and_login(client, "batch_rate_limit_user")
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(batch_routes, "user_limiter", TokenBucketLimiter(rate=0.001, burst=5, max_keys=10))
+    operations = [{"method": "GET", "path": "/lists"}] * 4
+
+    # The batch request itself is charged by the middleware, its other three operations by the route
+    response = await client.post("/batch", json={"operations": operations}, headers=headers)
+    assert response.status_code == 200
+    response = await client.post("/batch", json={"operations": operations}, headers=headers)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+async def test_batch_operations_are_recorded_in_metrics(client: httpx.AsyncClient):
+    headers = await register_and_login(client, "batch_metrics_user")
+    labels = {"method": "GET", "route": "/lists/{list_id}", "status_code": "404"}
+    before = REGISTRY.get_sample_value("http_requests_total", labels) or 0
+
+    response = await client.post("/batch", json={"operations": [{"method": "GET", "path": "/lists/0"}] * 2}, headers=headers)
+    assert response.status_code == 200
+    assert REGISTRY.get_sample_value("http_requests_total", labels) == before + 2
@@ -0,0 +1,61 @@
+# Imports from external libraries
+import httpx
+import orjson
+import pytest
+
+# Imports from app modules
+from app.config import settings
+from app.events import broker
+from app.routes.events import stream_events
+from app.utils import decode_access_token_user_id
+from tests.conftest import register_and_login
+
+pytestmark = pytest.mark.anyio
+
+
+async def open_stream(client: httpx.AsyncClient, username: str):
+    headers = await register_and_login(client, username)
+    user_id = decode_access_token_user_id(headers["Authorization"].removeprefix("Bearer "))
+    stream = stream_events(user_id) #type: ignore
+    assert await anext(stream) == b"retry: 3000\n\n"
+    return headers, user_id, stream
+
+
+async def test_mutation_reaches_open_stream(client: httpx.AsyncClient):
+    headers, user_id, stream = await open_stream(client, "events_stream_user")
+    try:
+        response = await client.post("/lists", json={"name": "groceries"}, headers=headers)
+        list_id = response.json()["data"]["list"]["id"]
+        message = await anext(stream)
+        assert message.startswith(b"event: list.created\ndata: ")
+        assert orjson.loads(message.split(b"data: ")[1])["list_id"] == list_id
+    finally:
+        await stream.aclose()
+    assert user_id not in broker.subscriptions
+
+
+async def test_rolled_back_batch_is_not_published(client: httpx.AsyncClient, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "EVENTS_HEARTBEAT_SECONDS", 0.1)
+    headers, _, stream = await open_stream(client, "events_rollback_user")
+    try:
+        response = await client.post("/batch", json={"atomic": True, "operations": [
+            {"method": "POST", "path": "/lists", "body": {"name": "groceries"}},
+            {"method": "GET", "path": "/lists/0"}
+        ]}, headers=headers)
+        assert response.json()["data"]["committed"] is False
+        assert await anext(stream) == b": heartbeat\n\n"
+    finally:
+        await stream.aclose()
+
+
+async def test_overflowing_stream_gets_resync(client: httpx.AsyncClient, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "EVENTS_QUEUE_SIZE", 2)
+    headers, user_id, stream = await open_stream(client, "events_overflow_user")
+    try:
+        for number in range(4):
+            await client.post("/lists", json={"name": f"list {number}"}, headers=headers)
+        messages = [message async for message in stream]
+    finally:
+        await stream.aclose()
+    assert [message.split(b"\n")[0] for message in messages] == [b"event: list.created"] * 2 + [b"event: resync"]
+    assert user_id not in broker.subscriptions
@@ -0,0 +1,44 @@
+# Imports from external libraries
+import httpx
+import pytest
+
+# Imports from app modules
+from app.config import settings
+import app.routes.bulk_import as bulk_import
+from tests.conftest import register_and_login
+
+pytestmark = pytest.mark.anyio
+
+
+def streamed(*chunks: bytes):
+    async def body():
+        for chunk in chunks:
+            yield chunk
+    return body()
+
+
+async def test_import_joins_lines_split_across_chunks(client: httpx.AsyncClient, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "IMPORT_CHUNK_MAX_ITEMS", 3)
+    headers = await register_and_login(client, "import_chunks_user")
+    body = streamed(b'{"name": "a", "list_', b'items": ["1", "2"]}\n{"na', b'me": "b", "list_items": ["3"]}\n', b'{"name": "c"}')
+
+    response = await client.post("/import", content=body, headers=headers)
+    assert response.status_code == 200
+    result = response.json()["data"]
+    assert (result["lines_read"], result["lists_created"], result["items_created"]) == (3, 3, 3)
+    # The first two lists reach the item cap, so they are written in a chunk of their own
+    assert [(chunk["first_line"], chunk["last_line"]) for chunk in result["chunks"]] == [(1, 2), (3, 3)]
+
+
+async def test_import_stops_at_oversized_line(client: httpx.AsyncClient, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(bulk_import, "MAX_LINE_BYTES", 32)
+    headers = await register_and_login(client, "import_oversized_user")
+    body = streamed(b'{"name": "kept"}\n{"name": "', b"x" * 40, b'"}\n{"name": "never read"}\n')
+
+    response = await client.post("/import", content=body, headers=headers)
+    assert response.status_code == 200
+    result = response.json()["data"]
+    assert (result["lines_read"], result["lists_created"]) == (2, 1)
+    assert result["chunks"][-1]["errors"][0]["line"] == 2
+    lists = (await client.get("/lists", headers=headers)).json()["data"]["lists"]
+    assert [lst["name"] for lst in lists] == ["kept"]
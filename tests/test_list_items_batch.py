@@ -0,0 +1,39 @@
+# Imports from external libraries
+import httpx
+import pytest
+
+# Imports from app modules
+from tests.conftest import register_and_login
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("changes", [{"content": None}, {"is_completed": None}])
+async def test_batch_update_rejects_null_changes(client: httpx.AsyncClient, changes: dict):
+    headers = await register_and_login(client, f"batch_null_{next(iter(changes))}")
+    response = await client.post("/lists", json={"name": "groceries", "list_items": ["milk"]}, headers=headers)
+    list_id = response.json()["data"]["list"]["id"]
+    response = await client.get(f"/lists/{list_id}/items", headers=headers)
+    item_id = response.json()["data"]["list_items"][0]["id"]
+
+    response = await client.patch(f"/lists/{list_id}/items", json={"update": {"ids": [item_id], "changes": changes}}, headers=headers)
+    assert response.status_code == 422
+
+    response = await client.get(f"/lists/{list_id}/items", headers=headers)
+    assert response.json()["data"]["list_items"][0]["content"] == "milk"
+    assert response.json()["data"]["list_items"][0]["is_completed"] is False
+
+
+async def test_batch_update_applies_changes(client: httpx.AsyncClient):
+    headers = await register_and_login(client, "batch_update_user")
+    response = await client.post("/lists", json={"name": "chores", "list_items": ["dishes", "laundry"]}, headers=headers)
+    list_id = response.json()["data"]["list"]["id"]
+    items = (await client.get(f"/lists/{list_id}/items", headers=headers)).json()["data"]["list_items"]
+
+    response = await client.patch(f"/lists/{list_id}/items", json={
+        "update": {"ids": [items[0]["id"]], "changes": {"is_completed": True}},
+        "delete": [items[1]["id"]]
+    }, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["data"]["deleted_ids"] == [items[1]["id"]]
+    assert response.json()["data"]["updated_items"][0]["is_completed"] is True
@@ -0,0 +1,64 @@
+# Imports from external libraries
+import httpx
+import pytest
+
+# Imports from app modules
+from app.cache import principal_cache
+from tests.conftest import register_and_login
+
+# Imports from standard library
+from typing import Any
+import re
+
+pytestmark = pytest.mark.anyio
+
+
+async def count_statements(client: httpx.AsyncClient, path: str, headers: dict[str, str], method: str = "GET", json: Any = None) -> int:
+    '''
+    Requests the path and returns the number of SQL statements the request executed,
+    as reported by the Server-Timing header.
+    '''
+    response = await client.request(method, path, headers=headers, json=json)
+    assert response.status_code == 200, response.text
+    match = re.search(r'desc="(\d+) statements"', response.headers["server-timing"])
+    assert match is not None
+    return int(match.group(1))
+
+
+async def test_get_list_statements_dont_grow_with_number_of_lists(client: httpx.AsyncClient):
+    headers = await register_and_login(client, "query_count_user")
+    response = await client.post("/lists", json={"name": "first"}, headers=headers)
+    list_id = response.json()["data"]["list"]["id"]
+
+    # The authenticated principal is looked up again on every measured request
+    principal_cache.clear()
+    statements_with_one_list = await count_statements(client, f"/lists/{list_id}", headers)
+
+    for number in range(50):
+        await client.post("/lists", json={"name": f"list {number}"}, headers=headers)
+    principal_cache.clear()
+    statements_with_many_lists = await count_statements(client, f"/lists/{list_id}", headers)
+
+    assert statements_with_many_lists == statements_with_one_list
+    # The principal's identity and the list, without the user's other lists
+    assert statements_with_one_list == 2
+
+
+@pytest.mark.parametrize("changes", [{"content": "oat milk", "is_completed": True}, {"content": "oat milk", "is_completed": False}])
+async def test_update_list_item_updates_item_once(client: httpx.AsyncClient, changes: dict[str, Any]):
+    headers = await register_and_login(client, f"query_count_item_{changes['is_completed']}")
+    response = await client.post("/lists", json={"name": "groceries", "list_items": ["milk"]}, headers=headers)
+    list_id = response.json()["data"]["list"]["id"]
+    item_id = (await client.get(f"/lists/{list_id}/items", headers=headers)).json()["data"]["list_items"][0]["id"]
+
+    principal_cache.clear()
+    statements = await count_statements(client, f"/lists/{list_id}/items/{item_id}", headers, "PATCH", changes)
+    # The principal, the item with its list, one UPDATE of the item (whether or not it flips) and one of the list
+    assert statements == 4
+
+    response = await client.get(f"/lists/{list_id}/items/{item_id}", headers=headers)
+    assert (response.json()["data"]["list_item"]["content"], response.json()["data"]["list_item"]["is_completed"]) == (
+        changes["content"], changes["is_completed"]
+    )
+    response = await client.get(f"/lists/{list_id}", headers=headers)
+    assert response.json()["data"]["list"]["completed_count"] == int(changes["is_completed"])
@@ -0,0 +1,93 @@
+# Imports from external libraries
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlmodel import SQLModel
+import httpx
+import pytest
+
+# Imports from app modules
+from app.db import db_engine, create_missing_indexes
+import app.crud.list_crud as list_crud
+import app.crud.list_item_crud as list_item_crud
+
+# Imports from standard library
+from datetime import datetime
+from typing import Any, Awaitable, Callable
+import os
+
+pytestmark = pytest.mark.anyio
+
+# (sort_by, index the listing must be read from, seek position)
+LIST_QUERIES = [
+    (None, "ix_list_user_id_id", (None, 1)),
+    ("created_at", "ix_list_user_id_created_at_id", (datetime(2024, 1, 1), 1)),
+    ("name", "ix_list_user_id_name_id", ("groceries", 1)),
+]
+ITEMS_INDEX = "ix_listitem_list_id_created_at_id"
+ITEMS_SEEK = (datetime(2024, 1, 1), 1)
+
+CrudCall = Callable[[AsyncSession], Awaitable[Any]]
+
+
+def list_queries() -> list[Any]:
+    params = []
+    for sort_by, index, seek in LIST_QUERIES:
+        for after in (None, seek):
+            call = lambda session, sort_by=sort_by, after=after: list_crud.get_user_lists(session, 1, None, sort_by, "asc", 1, 10, after)
+            params.append(pytest.param(call, index, id=f"lists-{sort_by or 'id'}-{'seek' if after else 'offset'}"))
+    for after in (None, ITEMS_SEEK):
+        call = lambda session, after=after: list_item_crud.get_list_items(session, 1, 1, 1, 10, after)
+        params.append(pytest.param(call, ITEMS_INDEX, id=f"items-{'seek' if after else 'offset'}"))
+    return params
+
+
+async def query_plan(engine: AsyncEngine, call: CrudCall, explain: str, setup: str | None = None) -> str:
+    '''
+    Runs the crud call, captures the first statement it executes and returns the database's plan for it.
+    '''
+    captured = []
+
+    def capture(connection, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        connection = await session.connection()
+        if setup:
+            await connection.exec_driver_sql(setup)
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            await call(session)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+        statement, parameters = captured[0]
+        rows = (await connection.exec_driver_sql(f"{explain} {statement}", parameters)).all()
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+@pytest.mark.parametrize("call, index", list_queries())
+async def test_sqlite_listing_uses_index(client: httpx.AsyncClient, call: CrudCall, index: str):
+    # The client runs the lifespan, which creates the tables and indexes
+    plan = await query_plan(db_engine, call, "EXPLAIN QUERY PLAN")
+    assert f"USING INDEX {index}" in plan or f"USING COVERING INDEX {index}" in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
+
+
+@pytest.fixture(scope="module")
+async def postgres_engine():
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = create_async_engine(url)
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+        await connection.run_sync(create_missing_indexes)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.parametrize("call, index", list_queries())
+async def test_postgres_listing_uses_index(postgres_engine: AsyncEngine, call: CrudCall, index: str):
+    # The test tables are small, so sequential scans are ruled out to see which index the planner picks
+    plan = await query_plan(postgres_engine, call, "EXPLAIN", setup="SET enable_seqscan = off")
+    assert index in plan, plan
+    assert "Sort Key" not in plan, plan
@@ -0,0 +1,36 @@
+# Imports from external libraries
+from sqlalchemy import text
+import httpx
+import pytest
+
+# Imports from app modules
+from app.db import db_engine
+from app.search import fts_matching_ids
+from tests.conftest import register_and_login
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_search_matches_only_own_rows(client: httpx.AsyncClient):
+    headers = await register_and_login(client, "search_owner_user")
+    other_headers = await register_and_login(client, "search_other_user")
+    await client.post("/lists", json={"name": "weekly groceries", "list_items": ["buy oat milk"]}, headers=headers)
+    await client.post("/lists", json={"name": "groceries", "list_items": ["buy milk", "milk again"]}, headers=other_headers)
+
+    response = await client.get("/search/lists", params={"q": "groceries"}, headers=headers)
+    assert [lst["name"] for lst in response.json()["data"]["lists"]] == ["weekly groceries"]
+    response = await client.get("/search/items", params={"q": "milk"}, headers=headers)
+    assert [item["content"] for item in response.json()["data"]["list_items"]] == ["buy oat milk"]
+    assert response.json()["data"]["total_items"] == 1
+
+
+async def test_full_text_match_is_owner_scoped(client: httpx.AsyncClient):
+    headers = await register_and_login(client, "search_scope_user")
+    response = await client.post("/lists", json={"name": "scoped", "list_items": ["unique scoped item"]}, headers=headers)
+    list_id = response.json()["data"]["list"]["id"]
+    async with db_engine.connect() as connection:
+        user_id = (await connection.execute(text("SELECT user_id FROM list WHERE id = :id"), {"id": list_id})).scalar()
+        matches = (await connection.execute(fts_matching_ids("listitem", "unique scoped", user_id))).scalars().all()
+        other_matches = (await connection.execute(fts_matching_ids("listitem", "unique scoped", user_id + 1000))).scalars().all()
+    assert len(matches) == 1
+    assert other_matches == []
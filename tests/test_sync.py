@@ -0,0 +1,121 @@
+# Imports from external libraries
+import httpx
+import pytest
+
+# Imports from app modules
+from app.config import settings
+from app.pagination import encode_sync_token
+from tests.conftest import register_and_login
+
+# Imports from standard library
+from datetime import datetime, timedelta
+from typing import Any
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def settled_immediately(monkeypatch: pytest.MonkeyPatch):
+    # Changes are synced as soon as they are committed, and every transaction is stamped again before committing
+    monkeypatch.setattr(settings, "SYNC_SETTLE_SECONDS", 0)
+
+
+async def sync(client: httpx.AsyncClient, headers: dict[str, str], since: str | None = None, page_size: int = 500) -> dict[str, Any]:
+    params: dict[str, Any] = {"page_size": page_size}
+    if since:
+        params["since"] = since
+    response = await client.get("/sync", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+async def create_list(client: httpx.AsyncClient, headers: dict[str, str], name: str, items: list[str]) -> tuple[int, list[int]]:
+    response = await client.post("/lists", json={"name": name, "list_items": items}, headers=headers)
+    list_id = response.json()["data"]["list"]["id"]
+    response = await client.get(f"/lists/{list_id}/items", headers=headers)
+    return list_id, [item["id"] for item in response.json()["data"]["list_items"]]
+
+
+async def test_sync_merges_streams_in_pages(client: httpx.AsyncClient):
+    headers = await register_and_login(client, "sync_pages_user")
+    list_id, item_ids = await create_list(client, headers, "groceries", ["milk", "eggs", "bread"])
+    await client.delete(f"/lists/{list_id}/items/{item_ids[0]}", headers=headers)
+
+    pages, token = [], None
+    while not pages or pages[-1]["has_more"]:
+        pages.append(await sync(client, headers, token, page_size=2))
+        token = pages[-1]["next_token"]
+    assert [page["has_more"] for page in pages] == [True] * (len(pages) - 1) + [False]
+    assert all(len(page["lists"]) + len(page["list_items"]) + len(page["deleted"]) <= 2 for page in pages)
+    # A first sync returns what exists, not the deletions before it
+    assert [lst["id"] for page in pages for lst in page["lists"]] == [list_id]
+    assert sorted(item["id"] for page in pages for item in page["list_items"]) == item_ids[1:]
+    assert not any(page["deleted"] for page in pages)
+
+    # The last token is up to date
+    changes = await sync(client, headers, token)
+    assert (changes["lists"], changes["list_items"], changes["deleted"], changes["has_more"]) == ([], [], [], False)
+
+
+async def test_sync_token_round_trip_and_errors(client: httpx.AsyncClient):
+    headers = await register_and_login(client, "sync_token_user")
+    token = (await sync(client, headers))["next_token"]
+    list_id, _ = await create_list(client, headers, "chores", [])
+    changes = await sync(client, headers, token)
+    assert [lst["id"] for lst in changes["lists"]] == [list_id]
+    assert (await sync(client, headers, changes["next_token"]))["lists"] == []
+
+    response = await client.get("/sync", params={"since": "not-a-token"}, headers=headers)
+    assert response.status_code == 400
+    old = datetime.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS + 1)
+    expired = encode_sync_token({"tombstones": (old, 0), "lists": (old, 0), "list_items": (old, 0)})
+    response = await client.get("/sync", params={"since": expired}, headers=headers)
+    assert response.status_code == 410
+
+
+async def test_sync_returns_deletions(client: httpx.AsyncClient):
+    headers = await register_and_login(client, "sync_deletions_user")
+    list_id, item_ids = await create_list(client, headers, "groceries", ["milk", "eggs", "bread"])
+    other_list_id, _ = await create_list(client, headers, "chores", ["dishes"])
+    token = (await sync(client, headers))["next_token"]
+
+    await client.delete(f"/lists/{list_id}/items/{item_ids[0]}", headers=headers)
+    await client.patch(f"/lists/{list_id}/items", json={"delete": item_ids[1:]}, headers=headers)
+    await client.delete(f"/lists/{other_list_id}", headers=headers)
+    deleted = (await sync(client, headers, token))["deleted"]
+    assert [(tombstone["entity"], tombstone["entity_id"], tombstone["list_id"]) for tombstone in deleted] == [
+        ("list_item", item_ids[0], list_id),
+        ("list_item", item_ids[1], list_id),
+        ("list_item", item_ids[2], list_id),
+        ("list", other_list_id, other_list_id)
+    ]
+
+
+async def test_sync_returns_items_of_changed_lists_only(client: httpx.AsyncClient):
+    headers = await register_and_login(client, "sync_changed_lists_user")
+    _, unchanged_item_ids = await create_list(client, headers, "groceries", ["milk"])
+    list_id, item_ids = await create_list(client, headers, "chores", ["dishes", "laundry"])
+    token = (await sync(client, headers))["next_token"]
+
+    response = await client.patch(f"/lists/{list_id}/items/{item_ids[1]}", json={"is_completed": True}, headers=headers)
+    changes = await sync(client, headers, token)
+    assert [item["id"] for item in changes["list_items"]] == [item_ids[1]]
+    assert [lst["id"] for lst in changes["lists"]] == [list_id]
+    assert unchanged_item_ids[0] not in [item["id"] for item in changes["list_items"]]
+
+    # The stamps written again before the commit are the ones returned
+    updated_item = response.json()["data"]["list_item"]
+    assert updated_item["last_modified_at"] == changes["list_items"][0]["last_modified_at"]
+
+
+async def test_restamped_list_matches_stored_list(client: httpx.AsyncClient):
+    headers = await register_and_login(client, "sync_restamp_user")
+    response = await client.post("/lists", json={"name": "groceries", "list_items": ["milk"]}, headers=headers)
+    created = response.json()["data"]["list"]
+    response = await client.get(f"/lists/{created['id']}", headers=headers)
+    assert response.json()["data"]["list"]["last_modified_at"] == created["last_modified_at"]
+
+    response = await client.patch(f"/lists/{created['id']}", json={"name": "shopping"}, headers=headers)
+    updated = response.json()["data"]["list"]
+    response = await client.get(f"/lists/{created['id']}", headers=headers)
+    assert response.json()["data"]["list"]["last_modified_at"] == updated["last_modified_at"]